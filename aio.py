@@ -0,0 +1,134 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from database import Database
+from models import EventManager
+
+
+class AsyncDatabase:
+    def __init__(self, db: Database, max_readers: int = 4):
+        '''Wraps a Database for asyncio code.
+           Reads run concurrently on a small thread pool (each thread gets its own WAL connection),
+           writes are serialized on a single dedicated thread so they never contend with each other.'''
+        self.db = db
+        self._readers = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix="db-read")
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-write")
+
+    async def _read(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(func, *args, **kwargs))
+
+    async def _write(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, partial(func, *args, **kwargs))
+
+    # ---------------- Writes ----------------
+    async def add_event(self, data: dict) -> int:
+        return await self._write(self.db.add_event, data)
+
+    async def add_events_many(self, rows, chunk_size: int | None = 1000) -> tuple[int, int]:
+        return await self._write(self.db.add_events_many, rows, chunk_size)
+
+    async def update_event(self, event_id: int, data: dict):
+        return await self._write(self.db.update_event, event_id, data)
+
+    async def delete_event(self, event_id: int):
+        return await self._write(self.db.delete_event, event_id)
+
+    async def mark_alert_sent_today(self, event_id: int):
+        return await self._write(self.db.mark_alert_sent_today, event_id)
+
+    async def run_in_transaction(self, func, *args, **kwargs):
+        '''Runs func(db, *args, **kwargs) on the writer thread inside one db.transaction().'''
+        def work():
+            with self.db.transaction():
+                return func(self.db, *args, **kwargs)
+        return await self._write(work)
+
+    # ---------------- Reads ----------------
+    async def get_event(self, event_id: int):
+        return await self._read(self.db.get_event, event_id)
+
+    async def list_events_by_date(self, date_str: str) -> list[dict]:
+        return await self._read(self.db.list_events_by_date, date_str)
+
+    async def list_all(self) -> list[dict]:
+        return await self._read(self.db.list_all)
+
+    async def list_page(self, after: tuple | None = None, limit: int = 100) -> list[dict]:
+        return await self._read(self.db.list_page, after, limit)
+
+    async def list_in_next_hours(self, now_iso: str, until_iso: str) -> list[dict]:
+        return await self._read(self.db.list_in_next_hours, now_iso, until_iso)
+
+    async def search(self, query: str, limit: int = 50) -> list[dict]:
+        return await self._read(self.db.search, query, limit)
+
+    async def days_with_events(self) -> set[str]:
+        return await self._read(self.db.days_with_events)
+
+    async def day_counts_between(self, start_date: str, end_date: str) -> list[dict]:
+        return await self._read(self.db.day_counts_between, start_date, end_date)
+
+    async def iter_all(self, limit: int = 500):
+        '''Async generator over all events, one keyset page per executor round-trip.'''
+        after = None
+        while True:
+            page = await self.list_page(after, limit)
+            if not page:
+                return
+            for ev in page:
+                yield ev
+            last = page[-1]
+            after = (last["date"], last["time"], last["id"])
+
+    # ---------------- Lifecycle ----------------
+    async def close(self):
+        '''Waits for queued work, stops the executors and closes the database.'''
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    def _shutdown(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+class AsyncEventManager:
+    def __init__(self, adb: AsyncDatabase, manager: EventManager | None = None):
+        '''Async counterpart of EventManager, running it on the executors of an AsyncDatabase.'''
+        self.adb = adb
+        self.manager = manager or EventManager(adb.db)
+
+    async def add(self, title, description, date, time, priority):
+        return await self.adb._write(self.manager.add, title, description, date, time, priority)
+
+    async def update(self, event_id, **kwargs):
+        return await self.adb._write(self.manager.update, event_id, **kwargs)
+
+    async def delete(self, event_id):
+        return await self.adb._write(self.manager.delete, event_id)
+
+    async def get(self, event_id):
+        return await self.adb._read(self.manager.get, event_id)
+
+    async def events_on(self, date_str):
+        return await self.adb._read(self.manager.events_on, date_str)
+
+    async def day_marks(self, start_date: str, end_date: str):
+        return await self.adb._read(self.manager.day_marks, start_date, end_date)
+
+    async def search(self, query: str, limit: int = 50):
+        return await self.adb._read(self.manager.search, query, limit)
+
+    async def next_up_in(self, hours: int = 3):
+        return await self.adb._read(self.manager.next_up_in, hours)
+
+    def countdown_for(self, event: dict) -> str:
+        '''Pure computation, no database access.'''
+        return self.manager.countdown_for(event)
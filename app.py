@@ -1,14 +1,21 @@
 import json
+import threading
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timedelta
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkcalendar import Calendar, DateEntry
 from database import Database
-from models import EventManager
+from models import BULK_IMPORTED, RESET, EventChange, EventManager
 from notifications import NotificationScheduler
+from daemon import DaemonClient
+from recurrence import normalize_rule
 from themes import apply_theme
-from reports import export_csv, export_json, import_csv, import_json
+from reports import export_csv, export_json, read_csv, read_json
+from backup import SnapshotRotator
+from dashboard import UpcomingDashboard
+from jobs import run_job
+from utils import PRIORITY_RANK
 
 
 APP_DIR = Path(__file__).parent
@@ -16,6 +23,27 @@ CONFIG_PATH = APP_DIR / "config.json"
 
 DEFAULT_CONFIG = {
     "theme": "Light",
+    # Events that started more than this many days ago move to the archive at startup (0 = never)
+    "archive_after_days": 90,
+    # Rotating online snapshots of events.db in ./backups (0 = disabled)
+    "snapshot_interval_hours": 0,
+    "snapshot_keep": 7,
+    # Only alerts due within this many hours are kept armed; the window rolls forward on its own
+    "alert_horizon_hours": 24,
+    # Scheduler metrics (firing lag, pending alerts, delivery failures) written as JSON every N seconds (0 = off)
+    "alert_stats_interval_seconds": 0,
+    # Hand alerts to a running notification daemon (python daemon.py) instead of scheduling them in the window
+    "use_daemon": True,
+    # Months cached ahead on each side of the displayed one (beyond the adjacent months it already shows)
+    "calendar_prefetch_months": 1,
+}
+
+# Calendar mark color by the highest priority of the day (1=Low, 2=Medium, 3=High)
+PRIORITY_MARKS = {
+    0: "#2563eb",
+    1: "#15803D",
+    2: "#D97706",
+    3: "#DC2626",
 }
 
 class EventPlannerApp(tk.Tk):
@@ -27,8 +55,13 @@ class EventPlannerApp(tk.Tk):
 
         self.db = Database()
         self.manager = EventManager(self.db)
+        self.manager.subscribe(self._on_change)
         self.config_data = self._load_config()
 
+        archive_days = self.config_data.get("archive_after_days", DEFAULT_CONFIG["archive_after_days"])
+        if archive_days:
+            self.db.archive_older_than(archive_days)
+
         apply_theme(self, self.config_data.get("theme", "Light"))
         
         self._build_menu()
@@ -37,8 +70,35 @@ class EventPlannerApp(tk.Tk):
         self._bind_events()
         self._start_future_events_tick()
 
-        self.notifier = NotificationScheduler(self.db)
+        self.notifier = self._connect_notifier()
+        self._start_notifier()
+
+        self.snapshots = SnapshotRotator(
+            self.db,
+            keep=self.config_data.get("snapshot_keep", DEFAULT_CONFIG["snapshot_keep"]),
+            interval_hours=self.config_data.get("snapshot_interval_hours", 0) or 24,
+        )
+        if self.config_data.get("snapshot_interval_hours"):
+            self.snapshots.start()
+
+    def _connect_notifier(self):
+        ''' Uses the notification daemon (daemon.py) when one is running, so alerts outlive the window;
+            otherwise schedules alerts inside this process. '''
+        if self.config_data.get("use_daemon", DEFAULT_CONFIG["use_daemon"]):
+            client = DaemonClient()
+            if client.available():
+                return client
+        return NotificationScheduler(
+            self.db,
+            horizon_hours=self.config_data.get("alert_horizon_hours", DEFAULT_CONFIG["alert_horizon_hours"]),
+        )
+
+    def _start_notifier(self):
+        '''Arms the pending alerts and, if configured, the periodic metrics dump.'''
         self.notifier.schedule_all()
+        interval = self.config_data.get("alert_stats_interval_seconds", 0)
+        if interval:
+            self.notifier.dump_stats(APP_DIR / "alert_stats.json", interval)
 
         #--------------------Config-------------------------
       
@@ -69,6 +129,9 @@ class EventPlannerApp(tk.Tk):
         file_m.add_command(label="Export CSV", command=self._export_csv)
         file_m.add_command(label="Export JSON", command=self._export_json)
         file_m.add_separator()
+        file_m.add_command(label="Backup Database", command=self._backup_db)
+        file_m.add_command(label="Restore Database...", command=self._restore_db)
+        file_m.add_separator()
         file_m.add_command(label="Exit", command=self.destroy)
         menubar.add_cascade(label="File", menu=file_m)
 
@@ -136,9 +199,10 @@ class EventPlannerApp(tk.Tk):
         )
         label.place(relx=0.5, rely=0.5, anchor="center")
 
-        # Card container
-        self.future_container = ttk.Frame(self.future_frame)
-        self.future_container.grid(row=1, column=0, sticky="nsew")
+        # Card list (virtualized: only the cards in view exist)
+        self.dashboard = UpcomingDashboard(self.future_frame, loader=self._get_future_events,
+                                           countdown=self.manager.countdown_for)
+        self.dashboard.grid(row=1, column=0, sticky="nsew")
 
         # -------------------------
         #     Calendar area - left
@@ -168,6 +232,14 @@ class EventPlannerApp(tk.Tk):
         ttk.Button(btns, text="➕ Add", command=self._add_dialog).grid(row=0, column=1, padx=4)
         ttk.Button(btns, text="✏️ Edit", command=self._edit_selected).grid(row=0, column=2, padx=4)
         ttk.Button(btns, text="🗑️ Delete", command=self._delete_selected).grid(row=0, column=3, padx=4)
+
+        # Search box (right-aligned)
+        btns.columnconfigure(4, weight=1)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(btns, textvariable=self.search_var, width=24)
+        search_entry.grid(row=0, column=5, padx=4, sticky="e")
+        search_entry.bind("<Return>", lambda e: self._search())
+        ttk.Button(btns, text="🔍 Search", command=self._search).grid(row=0, column=6, padx=4)
         
 
 
@@ -196,23 +268,67 @@ class EventPlannerApp(tk.Tk):
 
     def _bind_events(self):
         ''' Binds UI events to their respective functions.
-            In this case, selecting a date in the calendar triggers
-            an update of the event list for that specific day. '''
-        self.cal.bind("<<CalendarSelected>>", lambda e: self._refresh_day())
+            Selecting a date in the calendar triggers an update of the event
+            list for that specific day; changing the month reloads its marks. '''
+        self.cal.bind("<<CalendarSelected>>", lambda e: self._show_day())
+        self.cal.bind("<<CalendarMonthChanged>>", lambda e: self._load_calendar_marks())
+
+
+    def _visible_range(self):
+        ''' Returns the first and last date the calendar grid can show for the displayed month,
+            including the trailing/leading days of the neighbouring months. '''
+        month, year = self.cal.get_displayed_month()
+        first = date(year, month, 1)
+        return first - timedelta(days=7), first + timedelta(days=42)
 
 
     def _load_calendar_marks(self):
-        ''' Highlights days with events in the calendar.
-            Clears old marks, fetches dates from the database, and adds 
-            a visual indicator for each day that has registered activities. '''
+        ''' Highlights days with events in the displayed month.
+            Clears old marks, takes the per-month summaries covering the visible range
+            (cached by the manager until a write touches the month), and colors each busy day
+            by the highest priority scheduled on it. Neighbouring months are prefetched when idle. '''
         self.cal.calevent_remove('all')
-        for d in self.db.days_with_events():
-            try:
-                y, m, day = map(int, d.split('-'))
-                self.cal.calevent_create(datetime(y,m,day), 'event', 'has_event')
-            except Exception:
-                pass
-        self.cal.tag_config('has_event', background='#2563eb', foreground='white')
+        start, end = self._visible_range()
+        first, last = start.isoformat(), end.isoformat()
+        month, year = self.cal.get_displayed_month()
+        for y, m in (self._shift_month(year, month, k) for k in (-1, 0, 1)):
+            for mark in self.manager.month_marks(y, m):
+                if first <= mark['date'] <= last:
+                    self._create_mark(mark)
+        for rank, color in PRIORITY_MARKS.items():
+            self.cal.tag_config(f"priority_{rank}", background=color, foreground='white')
+        self.after_idle(self._prefetch_marks, year, month)
+
+    @staticmethod
+    def _shift_month(year: int, month: int, k: int):
+        y, m = divmod(year * 12 + month - 1 + k, 12)
+        return y, m + 1
+
+    def _prefetch_marks(self, year: int, month: int):
+        ''' Warms the month cache for the months around the displayed one,
+            so paging through the calendar does not wait on the database. '''
+        n = self.config_data.get("calendar_prefetch_months", DEFAULT_CONFIG["calendar_prefetch_months"])
+        for k in range(2, n + 2):
+            for sign in (1, -1):
+                self.manager.month_marks(*self._shift_month(year, month, sign * k))
+
+    def _create_mark(self, mark: dict):
+        try:
+            y, m, day = map(int, mark['date'].split('-'))
+            text = f"{mark['n']} event{'s' if mark['n'] != 1 else ''}"
+            self.cal.calevent_create(datetime(y,m,day), text, f"priority_{mark['max_priority']}")
+        except Exception:
+            pass
+
+    def _update_mark(self, date_str: str):
+        ''' Redraws the mark of a single day after one of its events changed. '''
+        try:
+            day = datetime.strptime(date_str, "%Y-%m-%d").date()
+        except ValueError:
+            return
+        self.cal.calevent_remove(date=day)
+        for mark in self.manager.day_marks(date_str, date_str):
+            self._create_mark(mark)
 
 
     # ---------------- Actions ----------------
@@ -222,86 +338,105 @@ class EventPlannerApp(tk.Tk):
     def _go_today(self):
         ''' Selects today's date in the calendar and refreshes the 
             event list for the current day. '''
-        from datetime import date
         self.cal.selection_set(date.today())
-        self._refresh_day()
+        self._show_day()
+        self._load_calendar_marks()
 
 
     def _get_future_events(self):
         ''' Returns future events, sorted chronologically by date and time. '''    
-        now = datetime.now()
-        events = self.db.list_all()
-        future = []
-
-
-        for ev in events:
-            try:
-                dt = datetime.strptime(f"{ev['date']} {ev['time']}", "%Y-%m-%d %H:%M")
-                if dt > now:
-                    future.append((dt, ev))
-
-            except:
-                pass
-
-        future.sort(key=lambda x: x[0])
-        return [ev for dt, ev in future]
+        return self.manager.upcoming()
     
     def _refresh_future_events(self):
-        ''' Reloads the dashboard with upcoming events:
-            clears old cards, fetches future events, and displays 
-            a colored card for each, including title, date/time, and countdown. '''
-        for widget in self.future_container.winfo_children():
-            widget.destroy()
+        ''' Reloads the upcoming events dashboard; only the cards in view are redrawn. '''
+        self.dashboard.reload()
 
 
-        events = self._get_future_events()
-        if not events:
-            ttk.Label(self.future_container, text="No upcoming events").pack(anchor="w", padx=6, pady=4)
-            return
-    
+    def _show_day(self):
+        ''' Fills the table with the events of the selected date. '''
+        for i in self.tree.get_children():
+            self.tree.delete(i)
+        date_str = self._current_date()
+        events = self.manager.events_on(date_str)
         for ev in events:
-            card = tk.Canvas(self.future_container, height=95, width=300,  highlightthickness=0, bg=self.cget("background"))
-
-            card.pack( padx=6, pady=6, anchor="nw")
-
-            colors = {
-                "Low":  ("#15803D", "#DCFCE7"),
-                "Medium": ("#D97706", "#FEF3C7"),
-                "High":  ("#DC2626", "#FEE2E2")
-            }
-
-            outline_color, fill_color = colors.get(ev.get("priority"), ("#6b7280", "#e5e7eb"))
-            card.create_rectangle(5,5,295,90, fill=fill_color, outline=outline_color, width=2)
-            card.create_text(20,20, text=ev.get("title", ""), font=("Segoe UI", 10, "bold"), anchor="w")
-            card.create_text(20,45, text=f"📅 {ev['date']}   🕒 {ev['time']}", anchor="w" )
-            left = EventManager(self.db).countdown_for(ev)
-            card.create_text(20,70, text=f"⏳ {left}", anchor='w' )
-
+            # An event appears at most once per day, so its id identifies the row
+            self.tree.insert('', tk.END, iid=str(ev['id']), values=self._row_values(ev))
+
+    def _row_values(self, ev: dict):
+        return (
+            ev['id'],
+            ev['title'],
+            ev['time'],
+            ev['priority'],
+            ev['description'] 
+        )
 
     def _refresh_day(self):
         ''' Updates events for the selected date:
             clears the table, loads the day's events, refreshes 
             calendar marks, and updates the upcoming events dashboard. '''
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        date_str = self._current_date()
-        events = self.manager.events_on(date_str)
-        for ev in events:
-            self.tree.insert(
-                '',
-                tk.END,
-                values=(
-                    ev['id'],
-                    ev['title'],
-                    ev['time'],
-                    ev['priority'],
-                    ev['description'] 
-                )
-            )
-            
+        self._show_day()
         self._load_calendar_marks()
         self._refresh_future_events()
 
+    # ---------------- Change bus ----------------
+
+    def _on_change(self, change: EventChange):
+        ''' Applies one write made through the manager to the table, the calendar marks
+            and the dashboard, touching only the affected row, days and card. '''
+        if change.kind in (BULK_IMPORTED, RESET):
+            self._refresh_day()
+            return
+        if change.recurring:
+            # The occurrences of a series may have moved on any day
+            self._show_day()
+            self._load_calendar_marks()
+            self._refresh_future_events()
+            return
+        ev, previous = change.event, change.previous
+        self._patch_row(change.event_id, ev)
+        for day in {e['date'] for e in (ev, previous) if e}:
+            self._update_mark(day)
+        if ev:
+            self.dashboard.upsert(ev, previous)
+        else:
+            self.dashboard.remove(previous)
+
+    def _patch_row(self, event_id: int, ev: dict | None):
+        ''' Inserts, updates, moves or removes the table row of one event. '''
+        iid = str(event_id)
+        if self.tree.exists(iid):
+            self.tree.delete(iid)
+        if ev is None or ev['date'] != self._current_date():
+            return
+        # Keep the day order: by time, then highest priority first
+        key = (ev['time'], -PRIORITY_RANK.get(ev['priority'], 0))
+        index = 0
+        for child in self.tree.get_children():
+            values = self.tree.item(child, 'values')
+            if (values[2], -PRIORITY_RANK.get(values[3], 0)) > key:
+                break
+            index += 1
+        self.tree.insert('', index, iid=iid, values=self._row_values(ev))
+
+    def _search(self):
+        ''' Runs a full-text search over titles and descriptions
+            and shows the ranked matches in a results window. '''
+        query = self.search_var.get().strip()
+        if not query:
+            return
+        SearchResults(self, query, self.manager.search(query, limit=200), on_open=self._open_date)
+
+    def _open_date(self, date_str: str):
+        ''' Selects the given date in the calendar and shows its events. '''
+        try:
+            y, m, d = map(int, date_str.split('-'))
+            self.cal.selection_set(datetime(y, m, d))
+        except Exception:
+            return
+        self._show_day()
+        self._load_calendar_marks()
+
     def _get_selected_event_id(self):
         ''' Returns the ID of the selected event from the table.
             If no row is selected, returns None. '''
@@ -312,8 +447,12 @@ class EventPlannerApp(tk.Tk):
 
 
     def _start_future_events_tick(self):
-        ''' Starts the automatic dashboard refresh every minute. '''
-        self._refresh_future_events()
+        ''' Starts the automatic dashboard refresh every minute.
+            The first call loads the events; later ticks only update the countdowns in place. '''
+        if self.dashboard.events:
+            self.dashboard.tick()
+        else:
+            self._refresh_future_events()
         self.after(60_000, self._start_future_events_tick)
 
     def _add_dialog(self):
@@ -324,10 +463,7 @@ class EventPlannerApp(tk.Tk):
     def _add_event(self, data: dict):
         ''' Saves the new event, schedules notifications, and updates the UI. '''
         event_id = self.manager.add(**data)
-        ev = self.db.get_event(event_id)
-        self.notifier.schedule_event(ev)
-        self._refresh_day()
-        self._refresh_future_events()
+        self.notifier.schedule_event(self.manager.get(event_id))
 
 
     def _edit_selected(self):
@@ -336,27 +472,45 @@ class EventPlannerApp(tk.Tk):
         if not event_id:
             messagebox.showinfo("Info", "Please select an event from the list.")
             return
-        ev = self.db.get_event(event_id)
+        ev = self.manager.get(event_id)
+        ev['recurrence'] = self.manager.get_recurrence(event_id)
         EventDialog(self,title="Edit Event", initial=ev, on_save=lambda d: self._update_event(event_id, d)).show()
 
     def _update_event(self, event_id: int, data: dict ):
         ''' Updates the event in the database, reschedules 
             notifications, and refreshes the interface. '''
         self.manager.update(event_id, **data)
-        ev = self.db.get_event(event_id)
-        self.notifier.schedule_event(ev)
-        self._refresh_day()
-        self._refresh_future_events()
+        self.notifier.schedule_event(self.manager.get(event_id))
 
     def _delete_selected(self):
         ''' Deletes the selected event from the table. '''
         event_id = self._get_selected_event_id()
         if not event_id:
             return
+        ev = self.manager.get(event_id)
+        day = self._current_date()
+        if ev and self.manager.get_recurrence(event_id):
+            # The selected row is one occurrence of a recurring event
+            answer = messagebox.askyesnocancel(
+                "Confirmation",
+                "This is a recurring event.\n\nYes: delete only this occurrence\nNo: delete the whole series"
+            )
+            if answer is None:
+                return
+            if answer:
+                self.manager.skip_occurrence(event_id, day)
+                ev = self.manager.get(event_id)
+                if ev:
+                    self.notifier.schedule_event(ev)
+                else:
+                    self.notifier.cancel_event(event_id)
+            else:
+                self.manager.delete(event_id)
+                self.notifier.cancel_event(event_id)
+            return
         if messagebox.askyesno("Confirmation", "Are you sure you want to delete the selected event?"):
             self.manager.delete(event_id)
-            self._refresh_day()
-            self._refresh_future_events()
+            self.notifier.cancel_event(event_id)
 
     # ------------- Settings & Export/Import -------------
 
@@ -369,33 +523,107 @@ class EventPlannerApp(tk.Tk):
     def _export_csv(self):
         path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV","*.csv")])
         if path:
-            export_csv(self.db, path)
-            messagebox.showinfo("Export", "CSV Export completed succesfully.")
+            self._run_export("CSV", export_csv, path)
 
     def _export_json(self):
         path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON","*.json")])
         if path:
-            export_json(self.db, path)
-            messagebox.showinfo("Export", "JSON Export completed succesfully.")
+            self._run_export("JSON", export_json, path)
+
+    def _run_export(self, kind: str, export, path: str):
+        ''' Writes the export on a worker thread behind a progress window. '''
+        def done(job):
+            if job.error:
+                messagebox.showerror("Export", f"{kind} Export failed:\n{job.error}")
+            elif job.result is None:
+                messagebox.showinfo("Export", f"{kind} Export cancelled; no file was written.")
+            else:
+                messagebox.showinfo("Export", f"{kind} Export completed succesfully.\nExported: {job.result}")
+
+        run_job(self, f"{kind} Export",
+                lambda job: export(self.db, path, progress=job.progress, cancel=job.cancelled),
+                done, total=self.db.count_events(include_archive=True))
     
     def _import_csv(self):
         path = filedialog.askopenfilename(filetypes=[("CSV Files","*.csv")])
         if path:
-            import_csv(self.db, path)
-            self._refresh_day()
-            messagebox.showinfo("Import", "CSV Import completed successfully.")  
+            self._run_import("CSV", read_csv, path)
 
     def _import_json(self):
         path = filedialog.askopenfilename(filetypes=[("JSON Files","*.json")])
         if path:
-            import_json(self.db, path)
-            self._refresh_day()
-            messagebox.showinfo("Import", "JSON Import completed successfully.")
+            self._run_import("JSON", read_json, path)
+
+    def _run_import(self, kind: str, reader, path: str):
+        ''' Inserts the file's rows on a worker thread behind a progress window;
+            the table, marks and alerts are updated once it is done. '''
+        def done(job):
+            inserted, rejected = job.result or (0, 0)
+            # Back on the Tk thread: safe to notify the change listeners
+            if job.error:
+                # Chunks committed before the failure are kept; reload everything
+                self.manager.invalidate()
+            else:
+                self.manager.imported(inserted)
+            self.notifier.refresh()
+            if job.error:
+                messagebox.showerror("Import", f"{kind} Import failed:\n{job.error}")
+            elif job.cancelled():
+                messagebox.showinfo("Import", f"{kind} Import cancelled.\n"
+                                              f"Imported: {inserted}   Rejected: {rejected}")
+            else:
+                messagebox.showinfo("Import", f"{kind} Import completed successfully.\n"
+                                              f"Imported: {inserted}   Rejected: {rejected}")
+
+        run_job(self, f"{kind} Import",
+                lambda job: self.db.add_events_many(reader(path), progress=job.progress, cancel=job.cancelled),
+                done)
+
+    def _backup_db(self):
+        ''' Takes a snapshot into the backups folder on a background thread,
+            polling for completion so the window stays responsive. '''
+        result = {}
+
+        def work():
+            try:
+                result["path"] = self.snapshots.snapshot()
+            except Exception as exc:
+                result["error"] = exc
+
+        worker = threading.Thread(target=work, name="db-snapshot", daemon=True)
+        worker.start()
+        self._poll_backup(worker, result)
+
+    def _poll_backup(self, worker, result):
+        if worker.is_alive():
+            self.after(200, self._poll_backup, worker, result)
+        elif "error" in result:
+            messagebox.showerror("Backup", f"Backup failed: {result['error']}")
+        else:
+            messagebox.showinfo("Backup", f"Backup saved to:\n{result['path']}")
+
+    def _restore_db(self):
+        ''' Replaces the current events with the contents of a snapshot. '''
+        path = filedialog.askopenfilename(initialdir=self.snapshots.directory, filetypes=[("Database","*.db")])
+        if not path:
+            return
+        if not messagebox.askyesno("Restore", "Replace all current events with this backup?"):
+            return
+        try:
+            self.db.restore(path)
+        except ValueError as exc:
+            messagebox.showerror("Restore", str(exc))
+            return
+        # Listeners get a reset change and reload the table, marks and dashboard
+        self.manager.invalidate()
+        self.notifier.reload()
+        messagebox.showinfo("Restore", "Database restored successfully.")
 
     def on_close(self):
         ''' Stops notifications, closes the database connection, and exits the application. '''
         try:
             self.notifier.stop()
+            self.snapshots.stop()
         finally:
             self.db.close()
             self.destroy()
@@ -447,7 +675,45 @@ class EventPlannerApp(tk.Tk):
         ttk.Button(frame, text="OK", command=about.destroy).pack(anchor="center")
 
 
-        
+
+class SearchResults:
+    def __init__(self, master, query: str, events: list[dict], on_open):
+        ''' Lists search results; double-clicking a row opens its day in the calendar. '''
+        self.on_open = on_open
+        self.top = tk.Toplevel(master)
+        self.top.title(f"Search: {query}")
+        self.top.transient(master)
+
+        frm = ttk.Frame(self.top)
+        frm.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
+
+        ttk.Label(frm, text=f"{len(events)} result(s) for \"{query}\"").pack(anchor="w", pady=(0, 6))
+
+        columns = ("date", "time", "title", "priority")
+        self.tree = ttk.Treeview(frm, columns=columns, show="headings", height=12)
+        self.tree.heading("date", text="Date")
+        self.tree.heading("time", text="Time")
+        self.tree.heading("title", text="Title")
+        self.tree.heading("priority", text="Priority")
+        self.tree.column("date", width=90, anchor=tk.CENTER)
+        self.tree.column("time", width=60, anchor=tk.CENTER)
+        self.tree.column("title", width=260)
+        self.tree.column("priority", width=70, anchor=tk.CENTER)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+
+        for ev in events:
+            self.tree.insert('', tk.END, values=(ev['date'], ev['time'], ev['title'], ev['priority']))
+        self.tree.bind("<Double-1>", lambda e: self._open_selected())
+
+    def _open_selected(self):
+        ''' Opens the day of the selected result and closes the window. '''
+        sel = self.tree.selection()
+        if not sel:
+            return
+        self.on_open(self.tree.item(sel[0], 'values')[0])
+        self.top.destroy()
+
+
 class EventDialog:
     def __init__(self, master, title: str, on_save, initial: dict | None = None):
         ''' Initializes the dialog window and form fields. '''
@@ -494,9 +760,19 @@ class EventDialog:
         self.pri_var = tk.StringVar(value=self.initial.get('priority','Medium'))
         ttk.Combobox(frm, textvariable=self.pri_var, values=['Low','Medium','High'], width=10, state='readonly').grid(row=4, column=1, sticky='w')
 
+        # Repeat Fields
+        rule = self.initial.get('recurrence') or {}
+        ttk.Label(frm, text="Repeat").grid(row=5, column=0, sticky='e', padx=6, pady=4)
+        self.repeat_var = tk.StringVar(value=rule.get('freq', 'never').capitalize())
+        ttk.Combobox(frm, textvariable=self.repeat_var, values=['Never','Daily','Weekly','Monthly'], width=10, state='readonly').grid(row=5, column=1, sticky='w')
+
+        ttk.Label(frm, text="Until").grid(row=6, column=0, sticky='e', padx=6, pady=4)
+        self.until_var = tk.StringVar(value=rule.get('until') or '')
+        ttk.Entry(frm, textvariable=self.until_var, width=12).grid(row=6, column=1, sticky='w')
+
         # Dialog Buttons
         buttons = ttk.Frame(frm)
-        buttons.grid(row=5, column=0, columnspan=2, pady=10)
+        buttons.grid(row=7, column=0, columnspan=2, pady=10)
         ttk.Button(buttons, text="Save", command=self._save).pack(side=tk.LEFT, padx=6)
         ttk.Button(buttons, text="Cancel", command=self.top.destroy).pack(side=tk.LEFT, padx=6)
 
@@ -513,6 +789,16 @@ class EventDialog:
         if not data['title']:
             messagebox.showerror("Eroare", "Title is required.")
             return
+        data['recurrence'] = None
+        if self.repeat_var.get() != 'Never':
+            # Keep interval, count and skipped dates of an existing series
+            rule = dict(self.initial.get('recurrence') or {})
+            rule.update(freq=self.repeat_var.get().lower(), until=self.until_var.get().strip() or None)
+            try:
+                data['recurrence'] = normalize_rule(rule)
+            except ValueError:
+                messagebox.showerror("Eroare", "Until must be a date in YYYY-MM-DD format.")
+                return
         self.on_save(data)
         self.top.destroy()
 
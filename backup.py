@@ -0,0 +1,103 @@
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from database import DB_FILE, Database
+
+BACKUP_DIR = Path(__file__).parent / "backups"
+SNAPSHOT_PATTERN = "events-*.db"
+
+
+class SnapshotRotator:
+    def __init__(self, db: Database, directory: Path | str = BACKUP_DIR, keep: int = 7,
+                 interval_hours: float = 24, pages_per_step: int = 1024):
+        '''Takes periodic online snapshots of the database and keeps only the newest "keep" of them.'''
+        self.db = db
+        self.directory = Path(directory)
+        self.keep = max(1, keep)
+        self.interval = interval_hours * 3600
+        self.pages_per_step = pages_per_step
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+
+    def list_snapshots(self) -> list[Path]:
+        '''Returns the existing snapshots, oldest first.'''
+        return sorted(self.directory.glob(SNAPSHOT_PATTERN))
+
+    def latest(self) -> Path | None:
+        snapshots = self.list_snapshots()
+        return snapshots[-1] if snapshots else None
+
+    def snapshot(self, progress=None) -> Path:
+        '''Writes a new snapshot and deletes the ones beyond the retention count.
+           The copy goes to a temporary name first, so a crash never leaves a half-written snapshot.'''
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # Microseconds keep two snapshots taken within the same second apart (and still sort by time)
+            dest = self.directory / f"events-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+            tmp = dest.with_suffix(".part")
+            self.db.backup(tmp, self.pages_per_step, progress)
+            tmp.replace(dest)
+            for old in self.list_snapshots()[:-self.keep or None]:
+                old.unlink(missing_ok=True)
+            return dest
+
+    def start(self):
+        '''Starts taking a snapshot every interval_hours, the first one after one interval.'''
+        self._schedule()
+
+    def _schedule(self):
+        self._timer = threading.Timer(self.interval, self._run)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _run(self):
+        try:
+            self.snapshot()
+        except Exception as exc:
+            print(f"[ERROR] Scheduled snapshot failed: {exc}")
+        finally:
+            self._schedule()
+
+    def stop(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+
+def main(argv=None):
+    '''Command line entry point: snapshot, list or restore backups of events.db.'''
+    parser = argparse.ArgumentParser(description="Event Planner database backups")
+    parser.add_argument("--db", default=str(DB_FILE), help="database file (default: events.db)")
+    parser.add_argument("--dir", default=str(BACKUP_DIR), help="snapshot directory")
+    parser.add_argument("--keep", type=int, default=7, help="number of snapshots to keep")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("snapshot", help="take a snapshot now")
+    sub.add_parser("list", help="list snapshots")
+    restore = sub.add_parser("restore", help="restore the database from a snapshot")
+    restore.add_argument("snapshot", nargs="?", help="snapshot file (default: the latest one)")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    rotator = SnapshotRotator(db, args.dir, keep=args.keep)
+    try:
+        if args.command == "snapshot":
+            print(rotator.snapshot())
+        elif args.command == "list":
+            for path in rotator.list_snapshots():
+                print(path)
+        elif args.command == "restore":
+            src = args.snapshot or rotator.latest()
+            if src is None:
+                parser.error("no snapshot to restore")
+            try:
+                db.restore(src)
+            except ValueError as exc:
+                parser.error(str(exc))
+            print(f"Restored {args.db} from {src}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from collections import OrderedDict
+from database import Database
+from utils import DT_FORMAT
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 256):
+        '''Bounded mapping that evicts the least recently used entry and counts hits and misses.'''
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        '''Returns the cached value, or None on a miss.'''
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class EventCache:
+    def __init__(self, db: Database, max_events: int = 1024, max_days: int = 128):
+        '''Read-through cache in front of the database: single events by id and day lists by date.
+           Writers must call the invalidate_* methods; EventManager does this for every change it makes.'''
+        self.db = db
+        self.events = LRUCache(max_events)
+        self.days = LRUCache(max_days)
+        self._lock = threading.Lock()
+
+    def get_event(self, event_id: int):
+        '''Returns a copy of the event with the given ID, loading it on a miss.'''
+        with self._lock:
+            ev = self.events.get(event_id)
+        if ev is None:
+            ev = self.db.get_event(event_id)
+            if ev is None:
+                return None
+            with self._lock:
+                self.events.put(event_id, ev)
+        return dict(ev)
+
+    def events_on(self, date_str: str) -> list[dict]:
+        '''Returns copies of the events of a day, loading the whole bucket on a miss.'''
+        with self._lock:
+            events = self.days.get(date_str)
+        if events is None:
+            events = self.db.list_events_by_date(date_str)
+            with self._lock:
+                self.days.put(date_str, events)
+        return [dict(ev) for ev in events]
+
+    def invalidate_event(self, event_id: int, *dates: str):
+        '''Drops an event and the day buckets it was or now is part of.'''
+        with self._lock:
+            self.events.pop(event_id)
+            for d in dates:
+                if d:
+                    self.days.pop(d)
+
+    def invalidate_all(self):
+        '''Drops everything, e.g. after a bulk import that bypassed EventManager.'''
+        with self._lock:
+            self.events.clear()
+            self.days.clear()
+
+    def stats(self) -> dict:
+        '''Returns hit/miss counters of both caches, for tuning their sizes.'''
+        with self._lock:
+            return {"events": self.events.stats(), "days": self.days.stats()}
+
+
+class StartIndex:
+    def __init__(self, db: Database):
+        '''Upcoming events kept in memory, ordered by their "YYYY-MM-DD HH:MM" start_at strings
+           (which sort chronologically), so time-window queries are a bisect plus a slice: O(log n + k).
+           Loaded on first use from the events starting from now on; kept current through add/discard,
+           or dropped with invalidate() and loaded again lazily.'''
+        self.db = db
+        self._keys: list[tuple[str, int]] = []
+        self._events: dict[int, dict] = {}
+        self._starts: dict[int, datetime] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        rows = self.db.list_in_next_hours(datetime.now().strftime(DT_FORMAT), "9999-12-31 23:59")
+        with self._lock:
+            self._keys, self._events, self._starts = [], {}, {}
+            for ev in rows:
+                self._add(ev)
+            # The rows come ordered by start_at, so this only orders ties by id
+            self._keys.sort()
+            self._loaded = True
+
+    def _add(self, ev: dict):
+        try:
+            start = datetime.strptime(ev["start_at"], DT_FORMAT)
+        except (KeyError, TypeError, ValueError):
+            return
+        self._keys.append((ev["start_at"], ev["id"]))
+        self._events[ev["id"]] = dict(ev)
+        self._starts[ev["id"]] = start
+
+    def add(self, ev: dict):
+        '''Inserts (or moves) one event.'''
+        if not self._loaded:
+            return
+        with self._lock:
+            self._discard(ev["id"])
+            try:
+                start = datetime.strptime(ev["start_at"], DT_FORMAT)
+            except (KeyError, TypeError, ValueError):
+                return
+            insort(self._keys, (ev["start_at"], ev["id"]))
+            self._events[ev["id"]] = dict(ev)
+            self._starts[ev["id"]] = start
+
+    def discard(self, event_id: int):
+        if not self._loaded:
+            return
+        with self._lock:
+            self._discard(event_id)
+
+    def _discard(self, event_id: int):
+        ev = self._events.pop(event_id, None)
+        if ev is None:
+            return
+        del self._starts[event_id]
+        key = (ev["start_at"], event_id)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._keys, self._events, self._starts = [], {}, {}
+
+    def between(self, start_iso: str, end_iso: str | None = None, limit: int | None = None) -> list[dict]:
+        '''Copies of the events starting in [start_iso, end_iso], earliest first, at most limit of them.'''
+        self._ensure_loaded()
+        with self._lock:
+            i = bisect_left(self._keys, (start_iso,))
+            j = len(self._keys) if end_iso is None else bisect_left(self._keys, (end_iso + "\uffff",))
+            if limit is not None:
+                j = min(j, i + limit)
+            return [dict(self._events[event_id]) for _, event_id in self._keys[i:j]]
+
+    def start_of(self, event_id: int) -> datetime | None:
+        '''The parsed start of an indexed event, or None if it is not (or no longer) upcoming.'''
+        with self._lock:
+            return self._starts.get(event_id)
+
+    def __len__(self):
+        return len(self._keys)
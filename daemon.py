@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+from pathlib import Path
+
+from database import DB_FILE, Database
+from notifications import NotificationScheduler
+
+SOCKET_PATH = Path(__file__).parent / "planner.sock"
+HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+# Protocol: one JSON object per line in each direction.
+#   request:  {"cmd": "ping" | "schedule" | "cancel" | "refresh" | "reload" | "stats", "event_id": ...}
+#   response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                reply = {"ok": True, "result": self.server.planner.handle(request)}
+            except Exception as exc:
+                reply = {"ok": False, "error": str(exc)}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class NotificationDaemon:
+    def __init__(self, db_path: Path | str = DB_FILE, socket_path: Path | str = SOCKET_PATH,
+                 horizon_hours: float | None = 24, stats_path: Path | str | None = None,
+                 stats_interval: float = 60):
+        '''Owns the alert scheduling for one events.db, independently of any window,
+           and takes schedule/cancel/refresh/reload/stats requests from front-ends over a Unix socket.'''
+        self.db = Database(db_path)
+        self.socket_path = Path(socket_path)
+        self.notifier = NotificationScheduler(self.db, horizon_hours=horizon_hours)
+        self.stats_path = stats_path
+        self.stats_interval = stats_interval
+        # Requests come from one thread per client; the scheduler is driven by one at a time
+        self._lock = threading.Lock()
+        self._server: socketserver.ThreadingUnixStreamServer | None = None
+
+    def handle(self, request: dict):
+        '''Runs one client request and returns its result.'''
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return "pong"
+        with self._lock:
+            if cmd == "schedule":
+                ev = self.db.get_event(int(request["event_id"]))
+                if ev is None:
+                    self.notifier.cancel_event(int(request["event_id"]))
+                else:
+                    self.notifier.schedule_event(ev)
+                return None
+            if cmd == "cancel":
+                self.notifier.cancel_event(int(request["event_id"]))
+                return None
+            if cmd == "refresh":
+                self.notifier.refresh()
+                return None
+            if cmd == "reload":
+                self.notifier.reload()
+                return None
+            if cmd == "stats":
+                return self.notifier.stats()
+        raise ValueError(f"unknown command: {cmd!r}")
+
+    def serve_forever(self):
+        '''Arms the alerts and serves clients until shutdown() (or SIGTERM/Ctrl+C).'''
+        if DaemonClient(self.socket_path).available():
+            raise RuntimeError(f"a daemon is already listening on {self.socket_path}")
+        # Left behind by a daemon that did not exit cleanly
+        self.socket_path.unlink(missing_ok=True)
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), _Handler)
+        self._server.daemon_threads = True
+        self._server.planner = self
+        os.chmod(self.socket_path, 0o600)
+        self.notifier.schedule_all()
+        if self.stats_path:
+            self.notifier.dump_stats(self.stats_path, self.stats_interval)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self.notifier.stop()
+            self.db.close()
+
+    def shutdown(self):
+        '''Stops serve_forever(); call from another thread or a signal handler.'''
+        if self._server:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+class DaemonClient:
+    def __init__(self, socket_path: Path | str = SOCKET_PATH, timeout: float = 2.0):
+        '''Talks to a NotificationDaemon. It has the scheduler methods the GUI uses, so it can
+           stand in for an in-process NotificationScheduler; alerts are then owned by the daemon
+           and keep running after the window closes.'''
+        self.socket_path = Path(socket_path)
+        self.timeout = timeout
+
+    def request(self, cmd: str, **args):
+        '''Sends one request and returns its result; raises OSError if the daemon is unreachable
+           and RuntimeError if it rejected the request.'''
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            sock.sendall((json.dumps({"cmd": cmd, **args}) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as f:
+                line = f.readline()
+        if not line:
+            raise ConnectionError("daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error"))
+        return reply.get("result")
+
+    def available(self) -> bool:
+        '''True if a daemon answers on the socket.'''
+        if not HAS_UNIX_SOCKETS or not self.socket_path.exists():
+            return False
+        try:
+            return self.request("ping") == "pong"
+        except (OSError, ValueError, RuntimeError):
+            return False
+
+    def _send(self, cmd: str, **args):
+        try:
+            return self.request(cmd, **args)
+        except (OSError, RuntimeError) as exc:
+            print(f"[ERROR] Notification daemon request '{cmd}' failed: {exc}")
+
+    # ---------------- NotificationScheduler interface ----------------
+
+    def schedule_all(self):
+        '''Nothing to do: the daemon armed everything when it started.'''
+
+    def schedule_event(self, event: dict):
+        self._send("schedule", event_id=event["id"])
+
+    def cancel_event(self, event_id: int):
+        self._send("cancel", event_id=event_id)
+
+    def refresh(self):
+        self._send("refresh")
+
+    def reload(self):
+        self._send("reload")
+
+    def stats(self) -> dict | None:
+        return self._send("stats")
+
+    def dump_stats(self, path, interval_seconds: float = 60):
+        '''Nothing to do: stats are dumped by the daemon (see its --stats option).'''
+
+    def stop(self):
+        '''Leaves the daemon running; closing a front-end does not cancel alerts.'''
+
+
+def main(argv=None):
+    '''Command line entry point: run the notification daemon, or query a running one.'''
+    parser = argparse.ArgumentParser(description="Event Planner notification daemon")
+    parser.add_argument("--db", default=str(DB_FILE), help="database file (default: events.db)")
+    parser.add_argument("--socket", default=str(SOCKET_PATH), help="Unix socket path")
+    parser.add_argument("--horizon", type=float, default=24, help="hours of alerts kept armed (0 = all)")
+    parser.add_argument("--stats", help="write scheduler stats as JSON to this file every minute")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "ping", "refresh", "reload", "stats"])
+    args = parser.parse_args(argv)
+
+    if not HAS_UNIX_SOCKETS:
+        parser.error("Unix sockets are not available on this platform")
+    if args.command != "run":
+        client = DaemonClient(args.socket)
+        print(json.dumps(client.request(args.command), indent=2))
+        return
+
+    daemon = NotificationDaemon(args.db, args.socket, args.horizon or None, args.stats)
+    signal.signal(signal.SIGTERM, lambda *_: daemon.shutdown())
+    print(f"Serving alerts for {args.db} on {args.socket}")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
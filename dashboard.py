@@ -0,0 +1,183 @@
+import tkinter as tk
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from tkinter import ttk
+
+from utils import DT_FORMAT
+
+# Outline and fill of a card by priority
+CARD_COLORS = {
+    "Low": ("#15803D", "#DCFCE7"),
+    "Medium": ("#D97706", "#FEF3C7"),
+    "High": ("#DC2626", "#FEE2E2"),
+}
+DEFAULT_COLORS = ("#6b7280", "#e5e7eb")
+
+CARD_WIDTH = 290
+CARD_HEIGHT = 85
+ROW_HEIGHT = CARD_HEIGHT + 12
+
+
+class _Card:
+    __slots__ = ("rect", "title", "when", "countdown", "row")
+
+    def __init__(self, canvas: tk.Canvas):
+        '''Canvas items of one card; reused for whichever row is scrolled into its place.'''
+        self.rect = canvas.create_rectangle(0, 0, CARD_WIDTH, CARD_HEIGHT, width=2)
+        self.title = canvas.create_text(0, 0, font=("Segoe UI", 10, "bold"), anchor="w")
+        self.when = canvas.create_text(0, 0, anchor="w")
+        self.countdown = canvas.create_text(0, 0, anchor="w")
+        self.row = None
+
+
+class UpcomingDashboard(ttk.Frame):
+    def __init__(self, master, loader, countdown, **kwargs):
+        ''' Scrollable list of upcoming event cards that only draws the rows in view.
+            loader() returns the upcoming events sorted by start; countdown(ev) formats the time left.
+            A fixed pool of cards (one screenful) is moved and relabelled while scrolling,
+            so the cost of a refresh does not depend on how many events there are. '''
+        super().__init__(master, **kwargs)
+        self.loader = loader
+        self.countdown = countdown
+        self.events: list[dict] = []
+        self._starts: list[str] = []
+        self._offset = 0
+        self._cards: list[_Card] = []
+
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.canvas = tk.Canvas(self, highlightthickness=0, width=CARD_WIDTH + 16,
+                                bg=self.winfo_toplevel().cget("background"))
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self._empty = self.canvas.create_text(8, 14, text="No upcoming events", anchor="w", state="hidden")
+
+        self.canvas.bind("<Configure>", lambda e: self._render())
+        self.canvas.bind("<MouseWheel>", lambda e: self._scroll_pixels(-e.delta // 120 * ROW_HEIGHT // 2))
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_pixels(-ROW_HEIGHT // 2))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_pixels(ROW_HEIGHT // 2))
+
+    # ---------------- Data ----------------
+
+    def reload(self):
+        ''' Fetches the upcoming events again and redraws the cards in view. '''
+        self.set_events(self.loader())
+
+    def set_events(self, events: list[dict]):
+        self.events = events
+        self._starts = [f"{ev['date']} {ev['time']}" for ev in events]
+        self._moved()
+
+    def remove(self, event: dict):
+        ''' Drops the card of one event (matched by id and its start) and redraws the cards in view. '''
+        row = self._find(event)
+        if row is not None:
+            del self.events[row]
+            del self._starts[row]
+            self._moved()
+
+    def upsert(self, event: dict, previous: dict | None = None):
+        ''' Adds the card of a new or edited event at its place in the list (or drops it if it
+            is no longer upcoming), without fetching the other events again. '''
+        row = self._find(previous or event)
+        if row is not None:
+            del self.events[row]
+            del self._starts[row]
+        start = f"{event['date']} {event['time']}"
+        if start > datetime.now().strftime(DT_FORMAT):
+            row = bisect_right(self._starts, start)
+            self.events.insert(row, event)
+            self._starts.insert(row, start)
+        self._moved()
+
+    def _find(self, event: dict) -> int | None:
+        start = f"{event['date']} {event['time']}"
+        row = bisect_left(self._starts, start)
+        while row < len(self._starts) and self._starts[row] == start:
+            if self.events[row]["id"] == event["id"]:
+                return row
+            row += 1
+        return None
+
+    def _moved(self):
+        # Rows after the change shifted; only the cards in view are relabelled
+        for card in self._cards:
+            card.row = None
+        self._render()
+
+    def tick(self):
+        ''' Per-minute update: rewrites the countdown texts in view.
+            Only when an event has started is the list fetched again. '''
+        now = datetime.now().strftime(DT_FORMAT)
+        if self._starts and self._starts[0] <= now:
+            self.reload()
+            return
+        for card in self._cards:
+            if card.row is not None:
+                self.canvas.itemconfigure(card.countdown, text=f"⏳ {self.countdown(self.events[card.row])}")
+
+    # ---------------- Scrolling ----------------
+
+    def _max_offset(self) -> int:
+        return max(0, len(self.events) * ROW_HEIGHT - self.canvas.winfo_height())
+
+    def _scroll_pixels(self, pixels: int):
+        self._set_offset(self._offset + pixels)
+
+    def _set_offset(self, offset: int):
+        offset = min(max(0, int(offset)), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        total = len(self.events) * ROW_HEIGHT
+        if action == "moveto":
+            self._set_offset(float(amount) * total)
+        elif unit == "pages":
+            self._scroll_pixels(int(amount) * self.canvas.winfo_height())
+        else:
+            self._scroll_pixels(int(amount) * ROW_HEIGHT // 2)
+
+    # ---------------- Drawing ----------------
+
+    def _render(self):
+        ''' Positions the card pool over the rows currently in view. '''
+        height = max(self.canvas.winfo_height(), ROW_HEIGHT)
+        self._offset = min(self._offset, self._max_offset())
+        needed = height // ROW_HEIGHT + 2
+        while len(self._cards) < needed:
+            self._cards.append(_Card(self.canvas))
+
+        first = self._offset // ROW_HEIGHT
+        for i, card in enumerate(self._cards):
+            row = first + i
+            if row >= len(self.events) or i >= needed:
+                card.row = None
+                for item in (card.rect, card.title, card.when, card.countdown):
+                    self.canvas.itemconfigure(item, state="hidden")
+                continue
+            if card.row != row:
+                self._fill(card, row)
+            y = row * ROW_HEIGHT - self._offset + 6
+            self.canvas.coords(card.rect, 8, y, 8 + CARD_WIDTH, y + CARD_HEIGHT)
+            self.canvas.coords(card.title, 22, y + 15)
+            self.canvas.coords(card.when, 22, y + 40)
+            self.canvas.coords(card.countdown, 22, y + 65)
+
+        self.canvas.itemconfigure(self._empty, state="hidden" if self.events else "normal")
+        total = len(self.events) * ROW_HEIGHT
+        if total > height:
+            self.scrollbar.set(self._offset / total, (self._offset + height) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _fill(self, card: _Card, row: int):
+        ev = self.events[row]
+        outline, fill = CARD_COLORS.get(ev.get("priority"), DEFAULT_COLORS)
+        self.canvas.itemconfigure(card.rect, fill=fill, outline=outline, state="normal")
+        self.canvas.itemconfigure(card.title, text=ev.get("title", ""), state="normal")
+        self.canvas.itemconfigure(card.when, text=f"📅 {ev['date']}   🕒 {ev['time']}", state="normal")
+        self.canvas.itemconfigure(card.countdown, text=f"⏳ {self.countdown(ev)}", state="normal")
+        card.row = row
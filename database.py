@@ -1,17 +1,122 @@
+import json
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from utils import ALERT_OFFSETS, DT_FORMAT, PRIORITY_RANK, combine
+from recurrence import last_occurrence, normalize_rule
 '''Establishes the database connection and initializes the schema.'''
 DB_FILE = Path(__file__).parent / "events.db"
+BUSY_TIMEOUT = 5.0
+
+class ConnectionManager:
+    def __init__(self, db_path: str, busy_timeout: float = BUSY_TIMEOUT):
+        '''Hands out one connection per thread, in WAL mode and with a busy timeout,
+           so readers on other threads never wait for a writer to commit.'''
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[tuple[threading.Thread, sqlite3.Connection]] = []
+        # A private in-memory database only exists inside the connection that created it
+        self._shared = self._connect() if db_path in ("", ":memory:") else None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        '''Returns the calling thread's connection, opening it on first use.'''
+        if self._shared is not None:
+            return self._shared
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._lock:
+                self._prune()
+                self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    def _prune(self):
+        '''Closes connections left behind by threads that have finished.'''
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def close_all(self):
+        '''Closes every connection handed out so far.'''
+        with self._lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        if self._shared is not None:
+            self._shared.close()
+        self._local = threading.local()
+
 
 class Database:
-    def __init__(self, db_path: Path | str = DB_FILE):
+    def __init__(self, db_path: Path | str = DB_FILE, busy_timeout: float = BUSY_TIMEOUT):
         '''Internal method to create the "events" table if it doesn't exist.'''
         self.db_path = str(db_path)
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.connections = ConnectionManager(self.db_path, busy_timeout)
+        self._tx = threading.local()
         self._init_schema()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        '''The connection owned by the calling thread.'''
+        return self.connections.connection()
+
+
+    @contextmanager
+    def transaction(self):
+        '''Groups several calls into one unit of work:
+           per-call commits are suppressed and everything is committed once at the end,
+           or rolled back if an exception escapes. Nested blocks become savepoints.'''
+        conn = self.conn
+        depth = getattr(self._tx, "depth", 0)
+        savepoint = f"sp_{depth}"
+        conn.execute("BEGIN" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._tx.depth = depth + 1
+        try:
+            yield self
+        except BaseException:
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                conn.commit()
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._tx.depth = depth
+
+    def _checkpoint(self):
+        '''Commits the work done so far when called directly inside the outermost transaction() block,
+           so long-running batches become durable in steps. Does nothing in nested blocks.'''
+        if getattr(self._tx, "depth", 0) == 1:
+            self.conn.commit()
+            self.conn.execute("BEGIN")
+
+    def _commit(self):
+        '''Commits the pending change unless a transaction() block will commit it later.'''
+        if not getattr(self._tx, "depth", 0):
+            self.conn.commit()
+
 
     def _init_schema(self):
         '''Internal method to create the "events" table if it doesn't exist.'''
@@ -26,20 +131,293 @@ class Database:
             time TEXT NOT NULL,
             priority TEXT CHECK(priority IN ('High', 'Medium', 'Low'))DEFAULT 'Medium',
             alerts INTEGER DEFAULT 1,
-            last_alert_sent TEXT
+            last_alert_sent TEXT,
+            start_at TEXT,
+            priority_rank INTEGER NOT NULL DEFAULT 2
             );"""
         )
+        self._migrate(cur)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_start_at ON events(start_at)")
+        # Matches the day view's ORDER BY, so it is read straight off the index without a sort step
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_day ON events(date, time, priority_rank DESC)")
+        self._init_day_counts(cur)
+        self._init_recurrence(cur)
+        self._init_archive(cur)
+        self.has_fts = self._init_search(cur)
+        self._init_outbox(cur)
         self.conn.commit()
 
 
+    # Current local minute, in the format of start_at/due_at
+    _NOW_SQL = "strftime('%Y-%m-%d %H:%M', 'now', 'localtime')"
+
+    def _init_outbox(self, cur):
+        '''Internal method to create the durable alert outbox.
+           Every alert an event will trigger is a row with its due time, filled in by triggers on event writes
+           from the alert_offsets table (seeded from utils.ALERT_OFFSETS); sent_at is set once it is delivered.'''
+        existed = cur.execute("SELECT sql FROM sqlite_master WHERE name='alert_outbox'").fetchone()
+        due = "strftime('%Y-%m-%d %H:%M', {0}, '-' || o.seconds || ' seconds')"
+        # Alerts already due when an event is written are never queued, so a later
+        # startup does not mistake them for alerts missed while the scheduler was down
+        pending = f"{due} >= {self._NOW_SQL}"
+        cur.executescript(
+            """
+            DROP TRIGGER IF EXISTS alert_outbox_ai;
+            DROP TRIGGER IF EXISTS alert_outbox_au;
+            DROP TRIGGER IF EXISTS alert_outbox_ad;
+            """
+        )
+        if existed and "AUTOINCREMENT" not in existed[0].upper():
+            # Older outboxes reused the ids of rows deleted by an edit, so a stale timer could claim
+            # the re-queued row; rebuild the table with ids that are never handed out twice
+            cur.executescript(
+                """
+                ALTER TABLE alert_outbox RENAME TO alert_outbox_old;
+                DROP INDEX IF EXISTS idx_alert_outbox_due;
+                """
+            )
+        cur.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS alert_offsets(
+            priority TEXT NOT NULL,
+            seconds INTEGER NOT NULL,
+            PRIMARY KEY(priority, seconds)
+            );
+            CREATE TABLE IF NOT EXISTS alert_outbox(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event_id INTEGER NOT NULL,
+            starts_at TEXT NOT NULL,
+            due_at TEXT NOT NULL,
+            sent_at TEXT,
+            UNIQUE(event_id, due_at)
+            );
+            CREATE INDEX IF NOT EXISTS idx_alert_outbox_due ON alert_outbox(due_at);
+            CREATE TRIGGER alert_outbox_ai AFTER INSERT ON events WHEN new.alerts BEGIN
+                INSERT OR IGNORE INTO alert_outbox(event_id, starts_at, due_at)
+                SELECT new.id, new.start_at, {due.format("new.start_at")}
+                FROM alert_offsets o
+                WHERE o.priority = new.priority AND {pending.format("new.start_at")};
+            END;
+            CREATE TRIGGER alert_outbox_au AFTER UPDATE OF start_at, priority, alerts ON events BEGIN
+                DELETE FROM alert_outbox WHERE event_id = old.id AND sent_at IS NULL;
+                INSERT OR IGNORE INTO alert_outbox(event_id, starts_at, due_at)
+                SELECT new.id, new.start_at, {due.format("new.start_at")}
+                FROM alert_offsets o
+                WHERE new.alerts AND o.priority = new.priority AND {pending.format("new.start_at")};
+            END;
+            CREATE TRIGGER alert_outbox_ad AFTER DELETE ON events BEGIN
+                DELETE FROM alert_outbox WHERE event_id = old.id;
+            END;
+            """
+        )
+        cur.execute("DELETE FROM alert_offsets")
+        cur.executemany(
+            "INSERT INTO alert_offsets(priority, seconds) VALUES(?,?)",
+            [(priority, seconds) for priority, offsets in ALERT_OFFSETS.items() for seconds in offsets],
+        )
+        if cur.execute("SELECT 1 FROM sqlite_master WHERE name='alert_outbox_old'").fetchone():
+            cur.executescript(
+                """
+                INSERT INTO alert_outbox(id, event_id, starts_at, due_at, sent_at)
+                SELECT id, event_id, starts_at, due_at, sent_at FROM alert_outbox_old;
+                DROP TABLE alert_outbox_old;
+                """
+            )
+        if not existed:
+            # Existing databases: queue the alerts of events that have not started yet
+            cur.execute(
+                f"""
+                INSERT OR IGNORE INTO alert_outbox(event_id, starts_at, due_at)
+                SELECT e.id, e.start_at, {due.format("e.start_at")}
+                FROM events e
+                JOIN alert_offsets o ON o.priority = e.priority
+                WHERE e.alerts AND {pending.format("e.start_at")}
+                """
+            )
+
+
+    # Columns shared by "events" and "events_archive"
+    EVENT_COLUMNS = (
+        "id", "title", "description", "date", "time", "priority",
+        "alerts", "last_alert_sent", "start_at", "priority_rank",
+    )
+
+    def _init_archive(self, cur):
+        '''Internal method to create the cold partition past events are moved into by archive_before().'''
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS events_archive(
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            date TEXT NOT NULL,
+            time TEXT NOT NULL,
+            priority TEXT,
+            alerts INTEGER,
+            last_alert_sent TEXT,
+            start_at TEXT,
+            priority_rank INTEGER NOT NULL DEFAULT 2,
+            archived_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_archive_day ON events_archive(date, time, priority_rank DESC);
+            CREATE INDEX IF NOT EXISTS idx_events_archive_start_at ON events_archive(start_at);
+            """
+        )
+
+    @property
+    def _archive_end(self) -> str | None:
+        '''Start of the newest archived event, or None while the archive is empty.
+           Read from the database each time (a single index seek), so it stays right when another
+           process, e.g. the notification daemon, archives or restores.'''
+        return self.conn.execute("SELECT MAX(start_at) FROM events_archive").fetchone()[0]
+
+
+    def _init_recurrence(self, cur):
+        '''Internal method to create the table of recurrence rules.
+           A series is stored once: its first occurrence is the row in "events" and the rule says how it repeats.
+           series_end (last occurrence start, NULL if endless) lets range queries skip finished series.'''
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS recurrence_rules(
+            event_id INTEGER PRIMARY KEY REFERENCES events(id) ON DELETE CASCADE,
+            freq TEXT NOT NULL CHECK(freq IN ('daily', 'weekly', 'monthly')),
+            interval INTEGER NOT NULL DEFAULT 1,
+            count INTEGER,
+            until TEXT,
+            exceptions TEXT NOT NULL DEFAULT '[]',
+            series_end TEXT
+            );
+            CREATE TRIGGER IF NOT EXISTS recurrence_rules_ad AFTER DELETE ON events BEGIN
+                DELETE FROM recurrence_rules WHERE event_id = old.id;
+            END;
+            """
+        )
+
+
+    def _init_day_counts(self, cur):
+        '''Internal method to create the per-day summary used for calendar marks.
+           Triggers keep the event count and highest priority (High=3 .. Low=1) of every date up to date.'''
+        existed = cur.execute("SELECT 1 FROM sqlite_master WHERE name='day_counts'").fetchone()
+        rank = "CASE {0}.priority WHEN 'High' THEN 3 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 1 ELSE 0 END"
+        cur.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS day_counts(
+            date TEXT PRIMARY KEY,
+            n INTEGER NOT NULL,
+            max_priority INTEGER NOT NULL
+            );
+            CREATE TRIGGER IF NOT EXISTS day_counts_ai AFTER INSERT ON events BEGIN
+                INSERT INTO day_counts(date, n, max_priority) VALUES (new.date, 1, {rank.format("new")})
+                ON CONFLICT(date) DO UPDATE SET n = n + 1, max_priority = MAX(max_priority, excluded.max_priority);
+            END;
+            CREATE TRIGGER IF NOT EXISTS day_counts_ad AFTER DELETE ON events BEGIN
+                UPDATE day_counts
+                    SET n = n - 1,
+                        max_priority = (SELECT COALESCE(MAX({rank.format("e")}), 0) FROM events e WHERE e.date = old.date)
+                    WHERE date = old.date;
+                DELETE FROM day_counts WHERE date = old.date AND n <= 0;
+            END;
+            CREATE TRIGGER IF NOT EXISTS day_counts_au AFTER UPDATE OF date, priority ON events BEGIN
+                UPDATE day_counts
+                    SET n = n - 1,
+                        max_priority = (SELECT COALESCE(MAX({rank.format("e")}), 0) FROM events e WHERE e.date = old.date)
+                    WHERE date = old.date;
+                DELETE FROM day_counts WHERE date = old.date AND n <= 0;
+                INSERT INTO day_counts(date, n, max_priority) VALUES (new.date, 1, {rank.format("new")})
+                ON CONFLICT(date) DO UPDATE SET n = n + 1, max_priority = MAX(max_priority, excluded.max_priority);
+            END;
+            """
+        )
+        if not existed:
+            cur.execute(
+                f"""
+                INSERT INTO day_counts(date, n, max_priority)
+                SELECT date, COUNT(*), MAX({rank.format("events")}) FROM events GROUP BY date
+                """
+            )
+
+
+    def _init_search(self, cur) -> bool:
+        '''Internal method to create the FTS5 indexes over titles and descriptions (one for "events",
+           one for "events_archive") and the triggers that keep them in sync.
+           Returns False when this SQLite build has no FTS5; search() then falls back to LIKE.'''
+        for table in ("events", "events_archive"):
+            fts = f"{table}_fts"
+            existed = cur.execute("SELECT 1 FROM sqlite_master WHERE name=?", (fts,)).fetchone()
+            try:
+                cur.execute(
+                    f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                    title, description,
+                    content='{table}', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                    );"""
+                )
+            except sqlite3.OperationalError:
+                return False
+            cur.executescript(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF title, description ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, title, description)
+                    VALUES ('delete', old.id, old.title, old.description);
+                    INSERT INTO {fts}(rowid, title, description)
+                    VALUES (new.id, new.title, new.description);
+                END;
+                """
+            )
+            if not existed:
+                cur.execute(f"INSERT INTO {fts}({fts}) VALUES('rebuild')")
+        return True
+
+
+    def _migrate(self, cur):
+        '''Internal method to bring databases created by older versions up to the current schema.'''
+        columns = {r["name"] for r in cur.execute("PRAGMA table_info(events)")}
+        if "start_at" not in columns:
+            cur.execute("ALTER TABLE events ADD COLUMN start_at TEXT")
+            # Normalized like every later write, so legacy values such as "2030-1-5" / "9:00" sort correctly
+            rows = cur.execute("SELECT id, date, time FROM events").fetchall()
+            cur.executemany(
+                "UPDATE events SET start_at=? WHERE id=?",
+                [(self._start_at(r["date"], r["time"]), r["id"]) for r in rows],
+            )
+        if "priority_rank" not in columns:
+            cur.execute("ALTER TABLE events ADD COLUMN priority_rank INTEGER NOT NULL DEFAULT 2")
+            cur.execute(
+                """
+                UPDATE events SET priority_rank = CASE priority
+                    WHEN 'High' THEN 3 WHEN 'Medium' THEN 2 WHEN 'Low' THEN 1 ELSE 0 END
+                """
+            )
+        # Superseded by idx_events_day, which starts with the same (date, time) columns
+        cur.execute("DROP INDEX IF EXISTS idx_events_date_time")
+
+
+    @staticmethod
+    def _start_at(date_str: str, time_str: str) -> str:
+        '''Returns the canonical "YYYY-MM-DD HH:MM" start of an event, used by the start_at index.'''
+        try:
+            return combine(date_str, time_str).strftime(DT_FORMAT)
+        except (TypeError, ValueError):
+            return f"{(date_str or '')[:10]} {(time_str or '')[:5]}"
+
+
     def add_event(self,data: dict) -> int:
         '''Adds a new event to the database.'''
         cur = self.conn.cursor()
         cur.execute(
             """
             
-            INSERT INTO events(title, description, date, time, priority)
-            VALUES(?,?,?,?,?)
+            INSERT INTO events(title, description, date, time, priority, start_at, priority_rank)
+            VALUES(?,?,?,?,?,?,?)
             """,
             (
                 data.get("title"),
@@ -47,20 +425,87 @@ class Database:
                 data.get("date"),
                 data.get("time"),
                 data.get("priority", "Medium"),
+                self._start_at(data.get("date"), data.get("time")),
+                PRIORITY_RANK.get(data.get("priority", "Medium"), 0),
             ),
         )
-        self.conn.commit()
+        self._commit()
         return cur.lastrowid
     
 
+    def add_events_many(self, rows, chunk_size: int | None = 1000, progress=None, cancel=None) -> tuple[int, int]:
+        '''Adds many events with executemany inside one transaction, committing once per chunk_size rows
+           (or once at the end if None; never before the end when called inside an outer transaction()).
+           Rows without a title, or with an invalid date, time or priority, are rejected instead of inserted.
+           After each chunk, progress(rows_read) is called and the import stops early if cancel() returns True;
+           the chunks committed until then are kept.
+           Returns a (inserted, rejected) tuple.'''
+        inserted = rejected = 0
+        chunk = []
+        cur = self.conn.cursor()
+        sql = """
+            INSERT INTO events(title, description, date, time, priority, alerts, start_at, priority_rank)
+            VALUES(?,?,?,?,?,?,?,?)
+            """
+        with self.transaction():
+            for data in rows:
+                params = self._bulk_params(data)
+                if params is None:
+                    rejected += 1
+                    continue
+                chunk.append(params)
+                if chunk_size and len(chunk) >= chunk_size:
+                    cur.executemany(sql, chunk)
+                    inserted += len(chunk)
+                    chunk = []
+                    self._checkpoint()
+                    if progress:
+                        progress(inserted + rejected)
+                    if cancel and cancel():
+                        break
+            if chunk:
+                cur.executemany(sql, chunk)
+                inserted += len(chunk)
+        if progress:
+            progress(inserted + rejected)
+        return inserted, rejected
+
+
+    @staticmethod
+    def _bulk_params(data: dict):
+        '''Validates one imported row and returns its INSERT parameters, or None if it must be rejected.'''
+        title = (data.get("title") or "").strip()
+        priority = data.get("priority") or "Medium"
+        if not title or priority not in PRIORITY_RANK:
+            return None
+        try:
+            start_at = combine(data.get("date"), data.get("time")).strftime(DT_FORMAT)
+            alerts = int(data.get("alerts", 1))
+        except (TypeError, ValueError):
+            return None
+        return (
+            title,
+            data.get("description"),
+            data.get("date"),
+            data.get("time"),
+            priority,
+            alerts,
+            start_at,
+            PRIORITY_RANK[priority],
+        )
+
+
     def update_event(self, event_id: int, data: dict):
-        '''Updates an existing event's information based on its ID.'''
+        '''Updates an existing event's information based on its ID.
+           An archived event is moved back into the hot table first.'''
         cur = self.conn.cursor()
+        if self._archive_end is not None:
+            self._unarchive(event_id)
         cur.execute(
 
             """
             UPDATE events
-                SET title=?, description=?, date=?, time=?, priority=?
+                SET title=?, description=?, date=?, time=?, priority=?, start_at=?, priority_rank=?
                 WHERE id=?
 
             """,
@@ -70,45 +515,61 @@ class Database:
                 data.get("date"),
                 data.get("time"),
                 data.get("priority", "Medium"),
+                self._start_at(data.get("date"), data.get("time")),
+                PRIORITY_RANK.get(data.get("priority", "Medium"), 0),
                 event_id,
             ),
         )
-        self.conn.commit()
+        self._commit()
     
     
     def delete_event(self, event_id: int):
-        '''Deletes an event from the database by ID.'''
+        '''Deletes an event from the database by ID, whether it is hot or archived.'''
         cur = self.conn.cursor()
         cur.execute("DELETE FROM events WHERE id=?", (event_id,))
-        self.conn.commit()
+        if not cur.rowcount and self._archive_end is not None:
+            cur.execute("DELETE FROM events_archive WHERE id=?", (event_id,))
+        self._commit()
 
     
     def get_event(self, event_id: int):
-        '''Returns a single event based on its ID.'''
+        '''Returns a single event based on its ID, looking in the archive if it is not in the hot table.'''
         cur = self.conn.cursor()
         cur.execute("SELECT * FROM events WHERE id=?", (event_id,))
         row = cur.fetchone()
+        if row is None and self._archive_end is not None:
+            cur.execute(f"SELECT {', '.join(self.EVENT_COLUMNS)} FROM events_archive WHERE id=?", (event_id,))
+            row = cur.fetchone()
         return dict(row) if row else None
     
     
     def list_events_by_date(self, date_str: str) -> list[dict]:
-        '''Lists all events for a specific date, ordered by time and priority.'''
+        '''Lists all events for a specific date, ordered by time and priority (served in idx_events_day order).
+           Archived events are included for dates the archive covers.'''
         cur = self.conn.cursor()
         cur.execute(
             """
             SELECT *
             FROM events
             WHERE date=?
-            ORDER BY time ASC,
-                     CASE priority
-                         WHEN 'High' THEN 3
-                         WHEN 'Medium' THEN 2
-                         WHEN 'Low' THEN 1
-                     END DESC
+            ORDER BY time ASC, priority_rank DESC
             """,
             (date_str,),
         )
-        return [dict(r) for r in cur.fetchall()]
+        events = [dict(r) for r in cur.fetchall()]
+        if self._archive_covers(date_str):
+            cur.execute(
+                f"""
+                SELECT {', '.join(self.EVENT_COLUMNS)}
+                FROM events_archive
+                WHERE date=?
+                ORDER BY time ASC, priority_rank DESC
+                """,
+                (date_str,),
+            )
+            events.extend(dict(r) for r in cur.fetchall())
+            events.sort(key=lambda ev: (ev["time"], -ev["priority_rank"]))
+        return events
     
     
     def list_all(self) -> list[dict]:
@@ -116,26 +577,199 @@ class Database:
         cur = self.conn.cursor()
         cur.execute("SELECT * FROM events ORDER BY date ASC, time ASC")
         return [dict(r) for r in cur.fetchall()]
+
+
+    def count_events(self, include_archive: bool = False) -> int:
+        '''Returns the number of stored events (plus the archived ones if include_archive is set).'''
+        cur = self.conn.cursor()
+        n = cur.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        if include_archive and self._archive_end is not None:
+            n += cur.execute("SELECT COUNT(*) FROM events_archive").fetchone()[0]
+        return n
+
+
+    def iter_all(self, batch_size: int = 500, include_archive: bool = False):
+        '''Yields all events ordered by date and time, fetching batch_size rows at a time.
+           Archived events are only read when include_archive is set (e.g. for full exports).'''
+        cur = self.conn.cursor()
+        if include_archive and self._archive_end is not None:
+            cols = ", ".join(self.EVENT_COLUMNS)
+            cur.execute(
+                f"""
+                SELECT {cols} FROM events
+                UNION ALL
+                SELECT {cols} FROM events_archive
+                ORDER BY date ASC, time ASC, id ASC
+                """
+            )
+        else:
+            cur.execute("SELECT * FROM events ORDER BY date ASC, time ASC, id ASC")
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for r in rows:
+                yield dict(r)
+
+
+    def list_page(self, after: tuple | None = None, limit: int = 100) -> list[dict]:
+        '''Returns the next page of events ordered by (date, time, id).
+           Pass the (date, time, id) of the last row of the previous page as "after";
+           the query seeks on the (date, time) prefix of idx_events_day, so every page costs the same
+           (only rows sharing one date and time are sorted by id).'''
+        cur = self.conn.cursor()
+        if after is None:
+            cur.execute(
+                "SELECT * FROM events ORDER BY date ASC, time ASC, id ASC LIMIT ?",
+                (limit,),
+            )
+        else:
+            cur.execute(
+                """
+                SELECT *
+                FROM events
+                WHERE (date, time, id) > (?, ?, ?)
+                ORDER BY date ASC, time ASC, id ASC
+                LIMIT ?
+                """,
+                (*after, limit),
+            )
+        return [dict(r) for r in cur.fetchall()]
+    
+
+    def search(self, query: str, limit: int = 50) -> list[dict]:
+        '''Searches titles and descriptions of hot and archived events; every word is matched as a prefix.
+           Results are ranked by relevance (bm25) when FTS5 is available.'''
+        words = re.findall(r"\w+", query or "")
+        if not words:
+            return []
+        cur = self.conn.cursor()
+        cols = ", ".join(self.EVENT_COLUMNS)
+        if self.has_fts:
+            match = " ".join(f'"{w}"*' for w in words)
+            cur.execute(
+                f"""
+                SELECT {cols} FROM (
+                    SELECT {", ".join(f"e.{c}" for c in self.EVENT_COLUMNS)}, events_fts.rank AS score
+                    FROM events_fts
+                    JOIN events e ON e.id = events_fts.rowid
+                    WHERE events_fts MATCH ?
+                    UNION ALL
+                    SELECT {", ".join(f"a.{c}" for c in self.EVENT_COLUMNS)}, events_archive_fts.rank AS score
+                    FROM events_archive_fts
+                    JOIN events_archive a ON a.id = events_archive_fts.rowid
+                    WHERE events_archive_fts MATCH ?
+                )
+                ORDER BY score
+                LIMIT ?
+                """,
+                (match, match, limit),
+            )
+        else:
+            where = " AND ".join("(title LIKE ? OR description LIKE ?)" for _ in words)
+            params = [p for w in words for p in (f"%{w}%", f"%{w}%")]
+            cur.execute(
+                f"""
+                SELECT {cols} FROM events WHERE {where}
+                UNION ALL
+                SELECT {cols} FROM events_archive WHERE {where}
+                ORDER BY date ASC, time ASC LIMIT ?
+                """,
+                (*params, *params, limit),
+            )
+        return [dict(r) for r in cur.fetchall()]
     
 
     def list_in_next_hours(self, now_iso: str, until_iso: str) -> list[dict]:
-        '''Lists events occurring within a specified time range (ISO format).'''
+        '''Lists events occurring within a specified time range (ISO format).
+           The bounds are normalized in Python so the query can seek on idx_events_start_at.'''
         cur = self.conn.cursor()
         cur.execute(
             """
             SELECT *
             FROM events
-            WHERE datetime(substr(date,1,10) || ' ' ||
-                       substr(time,1,5)) 
-              BETWEEN datetime(?) AND datetime(?)
-            ORDER BY date ASC, time ASC
+            WHERE start_at BETWEEN ? AND ?
+            ORDER BY start_at ASC
             """,
-            (now_iso, until_iso),
+            (self._normalize_iso(now_iso), self._normalize_iso(until_iso)),
         )
         
         return [dict(r) for r in cur.fetchall()]
     
 
+    @staticmethod
+    def _normalize_iso(value: str) -> str:
+        '''Brings an ISO date-time ("YYYY-MM-DD HH:MM[:SS]" or with a "T") to the start_at format.'''
+        return datetime.fromisoformat(value).strftime(DT_FORMAT)
+
+
+    # ---------------- Archive ----------------
+
+    def archive_before(self, cutoff_iso: str) -> int:
+        '''Moves events that started before cutoff_iso ("YYYY-MM-DD HH:MM") into events_archive.
+           Recurring events stay hot since their series may still be running. Returns the number of moved events.'''
+        cutoff = self._normalize_iso(cutoff_iso)
+        cols = ", ".join(self.EVENT_COLUMNS)
+        where = "start_at < ? AND id NOT IN (SELECT event_id FROM recurrence_rules)"
+        with self.transaction():
+            cur = self.conn.cursor()
+            cur.execute(
+                f"INSERT OR REPLACE INTO events_archive({cols}, archived_at) "
+                f"SELECT {cols}, ? FROM events WHERE {where}",
+                (datetime.now().strftime(DT_FORMAT), cutoff),
+            )
+            cur.execute(f"DELETE FROM events WHERE {where}", (cutoff,))
+            moved = cur.rowcount
+        return moved
+
+
+    def archive_older_than(self, days: int) -> int:
+        '''Archives every event that started more than the given number of days ago.'''
+        return self.archive_before((datetime.now() - timedelta(days=days)).strftime(DT_FORMAT))
+
+
+    def _archive_covers(self, date_str: str) -> bool:
+        '''True if the archive may hold events on or before the given date (only then is it queried).'''
+        end = self._archive_end
+        return end is not None and (date_str or "")[:10] <= end[:10]
+
+
+    def _unarchive(self, event_id: int) -> bool:
+        '''Moves an archived event back into the hot table, e.g. before it is edited.'''
+        cols = ", ".join(self.EVENT_COLUMNS)
+        cur = self.conn.cursor()
+        cur.execute(f"INSERT INTO events({cols}) SELECT {cols} FROM events_archive WHERE id=?", (event_id,))
+        if not cur.rowcount:
+            return False
+        cur.execute("DELETE FROM events_archive WHERE id=?", (event_id,))
+        return True
+
+
+    def list_range(self, start_iso: str, end_iso: str) -> list[dict]:
+        '''Lists the events starting in [start_iso, end_iso] ordered by start, from the hot table
+           and, only when the range reaches back into it, from the archive.'''
+        start, end = self._normalize_iso(start_iso), self._normalize_iso(end_iso)
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT * FROM events WHERE start_at BETWEEN ? AND ? ORDER BY start_at ASC",
+            (start, end),
+        )
+        events = [dict(r) for r in cur.fetchall()]
+        if self._archive_covers(start):
+            cur.execute(
+                f"""
+                SELECT {', '.join(self.EVENT_COLUMNS)}
+                FROM events_archive
+                WHERE start_at BETWEEN ? AND ?
+                ORDER BY start_at ASC
+                """,
+                (start, end),
+            )
+            events = [dict(r) for r in cur.fetchall()] + events
+            events.sort(key=lambda ev: ev["start_at"])
+        return events
+
+
     def mark_alert_sent_today(self, event_id: int):
         '''Updates the last_alert_sent column with today's date for a specific event.'''
         today = datetime.now().strftime("%Y-%m-%d")
@@ -144,15 +778,243 @@ class Database:
             "UPDATE events SET last_alert_sent=? WHERE id=?",
             (today, event_id),
         )
-        self.conn.commit()
+        self._commit()
 
     
+    # ---------------- Alert outbox ----------------
+
+    _PENDING_SQL = """
+        SELECT o.id AS alert_id, o.starts_at, o.due_at, e.*
+        FROM alert_outbox o
+        JOIN events e ON e.id = o.event_id
+        WHERE o.sent_at IS NULL AND o.due_at BETWEEN ? AND ?
+        """
+
+    def pending_alerts(self, start_iso: str, end_iso: str) -> list[dict]:
+        '''Returns the unsent alerts due in [start_iso, end_iso], earliest first, joined with their event.
+           One range scan over idx_alert_outbox_due, however many events exist.'''
+        cur = self.conn.cursor()
+        cur.execute(self._PENDING_SQL + " ORDER BY o.due_at ASC", (start_iso, end_iso))
+        return [dict(r) for r in cur.fetchall()]
+
+
+    def pending_alerts_for(self, event_id: int, start_iso: str, end_iso: str) -> list[dict]:
+        '''Same as pending_alerts(), for a single event.'''
+        cur = self.conn.cursor()
+        cur.execute(self._PENDING_SQL + " AND o.event_id = ? ORDER BY o.due_at ASC", (start_iso, end_iso, event_id))
+        return [dict(r) for r in cur.fetchall()]
+
+
+    def queue_occurrence_alerts(self, event_id: int, starts_at: str):
+        '''Adds the outbox rows of one occurrence of a recurring event (the first one is added by triggers).'''
+        due = "strftime('%Y-%m-%d %H:%M', ?, '-' || o.seconds || ' seconds')"
+        cur = self.conn.cursor()
+        cur.execute(
+            f"""
+            INSERT OR IGNORE INTO alert_outbox(event_id, starts_at, due_at)
+            SELECT e.id, ?, {due}
+            FROM events e
+            JOIN alert_offsets o ON o.priority = e.priority
+            WHERE e.id = ? AND e.alerts AND {due} >= {self._NOW_SQL}
+            """,
+            (starts_at, starts_at, event_id, starts_at),
+        )
+        self._commit()
+
+
+    def mark_alert_sent(self, alert_id: int, event_id: int, due_at: str) -> bool:
+        '''Claims an outbox alert for delivery by recording it as sent.
+           Returns False if it was already sent (e.g. by another scheduler on the same database)
+           or no longer matches the event and due time it was armed for;
+           only the caller that gets True may deliver it.'''
+        cur = self.conn.cursor()
+        cur.execute(
+            "UPDATE alert_outbox SET sent_at=? WHERE id=? AND event_id=? AND due_at=? AND sent_at IS NULL",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), alert_id, event_id, due_at),
+        )
+        self._commit()
+        return cur.rowcount == 1
+
+
+    def purge_alerts(self, before_iso: str) -> int:
+        '''Deletes outbox rows due before the given time, sent or not. Returns how many were removed.'''
+        cur = self.conn.cursor()
+        cur.execute("DELETE FROM alert_outbox WHERE due_at < ?", (before_iso,))
+        self._commit()
+        return cur.rowcount
+
+
+    def set_recurrence(self, event_id: int, rule: dict | None):
+        '''Makes an event repeat according to rule (see recurrence.normalize_rule), or stops it repeating if None.
+           Call again after moving the event so the stored series end follows it.'''
+        # Validated and looked up before the first write, so a bad rule or a missing event
+        # never leaves a half-done change (and an open transaction) behind
+        if rule is not None:
+            rule = normalize_rule(rule)
+        cur = self.conn.cursor()
+        row = cur.execute("SELECT start_at FROM events WHERE id=?", (event_id,)).fetchone()
+        if row is None:
+            return
+        # Queued alerts of later occurrences may no longer match the rule; the scheduler queues them again
+        cur.execute(
+            """
+            DELETE FROM alert_outbox
+            WHERE event_id = ? AND sent_at IS NULL AND starts_at <> ?
+            """,
+            (event_id, row["start_at"]),
+        )
+        if rule is None:
+            cur.execute("DELETE FROM recurrence_rules WHERE event_id=?", (event_id,))
+            self._commit()
+            return
+        end = last_occurrence(datetime.strptime(row["start_at"], DT_FORMAT), rule)
+        cur.execute(
+            """
+            INSERT OR REPLACE INTO recurrence_rules(event_id, freq, interval, count, until, exceptions, series_end)
+            VALUES(?,?,?,?,?,?,?)
+            """,
+            (
+                event_id,
+                rule["freq"],
+                rule["interval"],
+                rule["count"],
+                rule["until"],
+                json.dumps(rule["exceptions"]),
+                end.strftime(DT_FORMAT) if end else None,
+            ),
+        )
+        self._commit()
+
+
+    @staticmethod
+    def _rule_from_row(row) -> dict:
+        return {
+            "freq": row["freq"],
+            "interval": row["interval"],
+            "count": row["count"],
+            "until": row["until"],
+            "exceptions": json.loads(row["exceptions"]),
+        }
+
+
+    def get_recurrence(self, event_id: int) -> dict | None:
+        '''Returns the recurrence rule of an event, or None if it does not repeat.'''
+        cur = self.conn.cursor()
+        row = cur.execute("SELECT * FROM recurrence_rules WHERE event_id=?", (event_id,)).fetchone()
+        return self._rule_from_row(row) if row else None
+
+
+    def add_recurrence_exception(self, event_id: int, date_str: str):
+        '''Removes a single occurrence (by date) from a series.'''
+        rule = self.get_recurrence(event_id)
+        if rule is None:
+            return
+        rule["exceptions"] = rule["exceptions"] + [date_str]
+        self.set_recurrence(event_id, rule)
+
+
+    def list_series(self, start_iso: str | None = None, end_iso: str | None = None) -> list[tuple[dict, dict]]:
+        '''Returns (event, rule) pairs of the series that may have occurrences in the range.
+           Either bound may be omitted; finished series are skipped through series_end.'''
+        cur = self.conn.cursor()
+        cur.execute(
+            """
+            SELECT e.*, r.freq, r.interval, r.count, r.until, r.exceptions
+            FROM recurrence_rules r
+            JOIN events e ON e.id = r.event_id
+            WHERE (? IS NULL OR e.start_at <= ?)
+              AND (? IS NULL OR r.series_end IS NULL OR r.series_end >= ?)
+            """,
+            (end_iso, end_iso, start_iso, start_iso),
+        )
+        result = []
+        for row in cur.fetchall():
+            ev = {k: row[k] for k in row.keys() if k not in ("freq", "interval", "count", "until", "exceptions")}
+            result.append((ev, self._rule_from_row(row)))
+        return result
+
+
     def days_with_events(self) -> set[str]:
         '''Returns a set of all dates that have registered events.'''
         cur = self.conn.cursor()
-        cur.execute("SELECT DISTINCT date FROM events")
+        cur.execute("SELECT date FROM day_counts")
         return {r[0] for r in cur.fetchall()}
+
+
+    def day_counts_between(self, start_date: str, end_date: str) -> list[dict]:
+        '''Returns the event count ("n") and highest priority rank of every date in the range that has events.
+           Archived days are counted from the archive's index when the range reaches back into it.'''
+        cur = self.conn.cursor()
+        cur.execute(
+            "SELECT date, n, max_priority FROM day_counts WHERE date BETWEEN ? AND ? ORDER BY date",
+            (start_date, end_date),
+        )
+        counts = {r["date"]: dict(r) for r in cur.fetchall()}
+        if self._archive_covers(start_date):
+            cur.execute(
+                """
+                SELECT date, COUNT(*) AS n, MAX(priority_rank) AS max_priority
+                FROM events_archive
+                WHERE date BETWEEN ? AND ?
+                GROUP BY date
+                """,
+                (start_date, end_date),
+            )
+            for r in cur.fetchall():
+                day = counts.setdefault(r["date"], {"date": r["date"], "n": 0, "max_priority": 0})
+                day["n"] += r["n"]
+                day["max_priority"] = max(day["max_priority"], r["max_priority"])
+        return [counts[d] for d in sorted(counts)]
     
+    # ---------------- Backup ----------------
+
+    def backup(self, dest: Path | str, pages_per_step: int = 1024, progress=None):
+        '''Copies the live database into dest with the SQLite online backup API.
+           The copy advances pages_per_step pages at a time and lets other connections work in between,
+           so memory use stays flat whatever the database size. progress(status, remaining, total) is
+           called after every step.'''
+        target = sqlite3.connect(str(dest))
+        try:
+            self.conn.backup(target, pages=pages_per_step, progress=progress)
+        finally:
+            target.close()
+
+
+    def backup_async(self, dest: Path | str, pages_per_step: int = 1024, progress=None, on_done=None):
+        '''Runs backup() on a background thread and returns the thread.
+           on_done(error) is called from that thread with None on success or the raised exception.'''
+        def run():
+            error = None
+            try:
+                self.backup(dest, pages_per_step, progress)
+            except Exception as exc:
+                error = exc
+            if on_done:
+                on_done(error)
+
+        t = threading.Thread(target=run, name="db-backup", daemon=True)
+        t.start()
+        return t
+
+
+    def restore(self, src: Path | str, pages_per_step: int = 1024, progress=None):
+        '''Replaces the contents of the live database with the backup file src.
+           Backups taken by older versions are migrated to the current schema before any other
+           call sees them; a file without an "events" table is rejected with ValueError.'''
+        source = sqlite3.connect(f"file:{Path(src).as_posix()}?mode=ro", uri=True)
+        try:
+            try:
+                valid = source.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='events'").fetchone()
+            except sqlite3.DatabaseError:
+                valid = None
+            if not valid:
+                raise ValueError(f"{src} is not an Event Planner database")
+            source.backup(self.conn, pages=pages_per_step, progress=progress)
+        finally:
+            source.close()
+        self._init_schema()
+
+
     def close(self):
-        '''Closes the database connection. Recommended at the end of the session.'''
-        self.conn.close()
\ No newline at end of file
+        '''Closes all database connections. Recommended at the end of the session.'''
+        self.connections.close_all()
\ No newline at end of file
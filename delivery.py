@@ -0,0 +1,204 @@
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from metrics import LatencyHistogram
+
+try:
+    from plyer import notification
+except ImportError:
+    notification = None
+
+try:
+    import winsound
+except ImportError:
+    # Only available on Windows
+    winsound = None
+
+
+# ---------------- Backends ----------------
+
+class ConsoleBackend:
+    name = "console"
+
+    def send(self, title: str, message: str):
+        print(f"{title}\n{message}")
+
+
+class PlyerBackend:
+    name = "plyer"
+
+    def __init__(self, timeout: int = 10):
+        '''Native desktop notification through plyer.'''
+        if notification is None:
+            raise RuntimeError("plyer is not installed")
+        self.timeout = timeout
+
+    def send(self, title: str, message: str):
+        notification.notify(title=title, message=message, app_name="Event Planner", timeout=self.timeout)
+
+
+class SoundBackend:
+    name = "sound"
+
+    def __init__(self):
+        '''System "exclamation" sound; Windows only.'''
+        if winsound is None:
+            raise RuntimeError("winsound is only available on Windows")
+
+    def send(self, title: str, message: str):
+        winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
+
+
+class LogFileBackend:
+    name = "logfile"
+
+    def __init__(self, path: Path | str):
+        '''Appends every notification as one line to a text file.'''
+        self.path = Path(path)
+
+    def send(self, title: str, message: str):
+        line = f"{datetime.now().isoformat(timespec='seconds')}\t{title}\t{message.replace(chr(10), ' | ')}\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self):
+        '''Keeps delivered notifications in a list; meant for tests.'''
+        self.sent: list[tuple[str, str]] = []
+
+    def send(self, title: str, message: str):
+        self.sent.append((title, message))
+
+
+def default_backends() -> list:
+    '''Sound (Windows) plus a desktop notification, or the console when plyer is missing.'''
+    backends = []
+    for factory in (SoundBackend, PlyerBackend):
+        try:
+            backends.append(factory())
+        except RuntimeError:
+            pass
+    if not any(b.name == "plyer" for b in backends):
+        backends.append(ConsoleBackend())
+    return backends
+
+
+# ---------------- Queue ----------------
+
+_CLOSE = object()
+
+class DeliveryQueue:
+    def __init__(self, backends: list | None = None, coalesce_seconds: float = 2.0,
+                 max_per_minute: int = 6, maxsize: int = 1000):
+        '''Bounded queue of notifications drained by one worker thread.
+           Alerts arriving within coalesce_seconds of each other are merged into one digest,
+           and at most max_per_minute notifications are delivered; alerts held back by the
+           limit are folded into the next digest instead of piling up.'''
+        self.backends = backends if backends is not None else default_backends()
+        self.coalesce_seconds = coalesce_seconds
+        self.max_per_minute = max_per_minute
+        self.dropped = 0
+        self.delivered = 0
+        self.failures: dict[str, int] = {}
+        self.latency: dict[str, LatencyHistogram] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._sent_times: deque = deque()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, title: str, message: str) -> bool:
+        '''Queues a notification; returns False (and counts it as dropped) when the queue is full.'''
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((title, message))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="alert-delivery", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _CLOSE:
+                return
+            batch = [item]
+            closing = self._collect(batch, time.monotonic() + self.coalesce_seconds)
+            # Over the rate limit: keep merging new alerts until a slot frees up
+            while not closing and self._wait_for_slot() > 0:
+                closing = self._collect(batch, time.monotonic() + self._wait_for_slot())
+            self._deliver(batch)
+            if closing:
+                return
+
+    def _collect(self, batch: list, deadline: float) -> bool:
+        '''Adds alerts arriving before deadline to batch; returns True if close() was requested.'''
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return False
+            if item is _CLOSE:
+                return True
+            batch.append(item)
+
+    def _wait_for_slot(self) -> float:
+        '''Seconds until another notification may be sent under max_per_minute (0 if now).'''
+        now = time.monotonic()
+        while self._sent_times and now - self._sent_times[0] >= 60:
+            self._sent_times.popleft()
+        if not self.max_per_minute or len(self._sent_times) < self.max_per_minute:
+            return 0
+        return 60 - (now - self._sent_times[0])
+
+    def _deliver(self, batch: list):
+        if len(batch) == 1:
+            title, message = batch[0]
+        else:
+            title = f"🔔 {len(batch)} event alerts"
+            message = "\n".join(t for t, _ in batch)
+        self._sent_times.append(time.monotonic())
+        self.delivered += 1
+        for backend in self.backends:
+            started = time.perf_counter()
+            try:
+                backend.send(title, message)
+            except Exception as exc:
+                self.failures[backend.name] = self.failures.get(backend.name, 0) + 1
+                print(f"[ERROR] Could not deliver notification via {backend.name}: {exc}")
+            finally:
+                self.latency.setdefault(backend.name, LatencyHistogram()).record(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        '''Delivered/dropped notification counts, failures and send latency per backend.'''
+        return {
+            "queued": self._queue.qsize(),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "failures": dict(self.failures),
+            "latency": {name: h.snapshot() for name, h in list(self.latency.items())},
+        }
+
+    def close(self, timeout: float | None = 5.0):
+        '''Delivers what is queued (one last digest) and stops the worker; submit() starts a new one.'''
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_CLOSE)
+        thread.join(timeout)
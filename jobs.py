@@ -0,0 +1,101 @@
+import threading
+import tkinter as tk
+from tkinter import ttk
+
+
+class Job:
+    def __init__(self, name: str, func, total: int | None = None):
+        '''A long operation run on a worker thread: func(job) does the work and returns its result,
+           reporting job.progress(rows_done) and stopping early when job.cancelled() is True.
+           The UI only reads the attributes below, so it never blocks on the worker.'''
+        self.name = name
+        self.func = func
+        self.total = total
+        self.done = 0
+        self.result = None
+        self.error: Exception | None = None
+        self.finished = False
+        self._cancel = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            self.result = self.func(self)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.finished = True
+
+    def progress(self, done: int):
+        self.done = done
+
+    def cancel(self):
+        '''Asks the worker to stop at its next check.'''
+        self._cancel.set()
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+
+class JobDialog:
+    def __init__(self, master, job: Job, on_done, poll_ms: int = 100):
+        ''' Progress window of a running job, refreshed with after() polling so the main loop
+            stays free. on_done(job) is called on the Tk thread once the worker has finished
+            (check job.error and job.cancelled()). '''
+        self.master = master
+        self.job = job
+        self.on_done = on_done
+        self.poll_ms = poll_ms
+
+        self.top = tk.Toplevel(master)
+        self.top.title(job.name)
+        self.top.transient(master)
+        self.top.resizable(False, False)
+        self.top.protocol("WM_DELETE_WINDOW", self._cancel)
+
+        frm = ttk.Frame(self.top)
+        frm.pack(fill=tk.BOTH, expand=True, padx=16, pady=12)
+
+        self.label = ttk.Label(frm, text=f"{job.name}...")
+        self.label.pack(anchor="w", pady=(0, 6))
+        mode = "determinate" if job.total else "indeterminate"
+        self.bar = ttk.Progressbar(frm, length=320, mode=mode, maximum=job.total or 100)
+        self.bar.pack(fill=tk.X)
+        if not job.total:
+            self.bar.start(15)
+        self.cancel_btn = ttk.Button(frm, text="Cancel", command=self._cancel)
+        self.cancel_btn.pack(anchor="e", pady=(10, 0))
+
+        self.top.after(self.poll_ms, self._poll)
+
+    def _cancel(self):
+        self.job.cancel()
+        self.cancel_btn.state(["disabled"])
+        self.label.config(text="Cancelling...")
+
+    def _poll(self):
+        job = self.job
+        if job.finished:
+            self.bar.stop()
+            self.top.destroy()
+            self.on_done(job)
+            return
+        if not job.cancelled():
+            if job.total:
+                self.bar["value"] = min(job.done, job.total)
+                self.label.config(text=f"{job.name}: {job.done:,} of {job.total:,} rows")
+            else:
+                self.label.config(text=f"{job.name}: {job.done:,} rows")
+        self.top.after(self.poll_ms, self._poll)
+
+
+def run_job(master, name: str, func, on_done, total: int | None = None) -> Job:
+    ''' Starts func(job) on a worker thread and shows its progress window. '''
+    job = Job(name, func, total)
+    job.start()
+    JobDialog(master, job, on_done)
+    return job
@@ -0,0 +1,94 @@
+import json
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+
+# Upper bounds (seconds) of the latency buckets; the last bucket catches everything above
+LATENCY_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 60, 300)
+
+
+class LatencyHistogram:
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        '''Fixed-bucket histogram of durations in seconds; record() is O(log buckets) and thread-safe.'''
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        seconds = max(0.0, seconds)
+        with self._lock:
+            self.counts[bisect_left(self.bounds, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float | None:
+        '''Upper bound of the bucket holding the q-quantile (the observed max for the overflow bucket).'''
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = list(self.counts)
+            count, total, peak = self.count, self.total, self.max
+        labels = [f"<={b}" for b in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            "count": count,
+            "mean": total / count if count else None,
+            "max": peak,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {label: n for label, n in zip(labels, counts) if n},
+        }
+
+
+class StatsDumper:
+    def __init__(self, source, path: Path | str, interval_seconds: float = 60):
+        '''Writes source() as JSON to path every interval_seconds (through a temporary file,
+           so readers never see a half-written dump).'''
+        self.source = source
+        self.path = Path(path)
+        self.interval = interval_seconds
+        self._timer: threading.Timer | None = None
+
+    def dump(self):
+        data = {"at": datetime.now().isoformat(timespec="seconds"), **self.source()}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def start(self):
+        self._timer = threading.Timer(self.interval, self._run)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _run(self):
+        try:
+            self.dump()
+        except Exception as exc:
+            print(f"[ERROR] Could not write stats to {self.path}: {exc}")
+        finally:
+            if self._timer is not None:
+                self.start()
+
+    def stop(self):
+        '''Stops the periodic dumps after writing a final one.'''
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+            try:
+                self.dump()
+            except Exception as exc:
+                print(f"[ERROR] Could not write stats to {self.path}: {exc}")
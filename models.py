@@ -1,41 +1,295 @@
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from cache import EventCache, LRUCache, StartIndex
 from database import Database
-from utils import combine, human_countdown
+from recurrence import as_occurrence, next_occurrence, occurrences, starting_at
+from utils import DATE_FORMAT, DT_FORMAT, PRIORITY_RANK, combine, human_countdown
+
+# Marker for "argument not passed" where None is a meaningful value
+_KEEP = object()
+
+# Kinds of EventChange
+ADDED = "added"
+UPDATED = "updated"
+DELETED = "deleted"
+BULK_IMPORTED = "bulk_imported"
+# Anything may have changed (e.g. after a restore); listeners should reload
+RESET = "reset"
+
+
+class EventChange:
+    __slots__ = ("kind", "event_id", "event", "previous", "recurring", "count")
+
+    def __init__(self, kind: str, event_id: int | None = None, event: dict | None = None,
+                 previous: dict | None = None, recurring: bool = False, count: int = 0):
+        """Describes one write made through an EventManager.
+        event is the stored row after the change (added/updated), previous the row before it
+        (updated/deleted); recurring is set when a series is involved, whose occurrences
+        may have moved too; count is the number of rows of a bulk import."""
+        self.kind = kind
+        self.event_id = event_id
+        self.event = event
+        self.previous = previous
+        self.recurring = recurring
+        self.count = count
+
+    def __repr__(self):
+        return f"EventChange({self.kind!r}, event_id={self.event_id!r}, count={self.count})"
 
 class EventManager:
-    def __init__(self, db: Database):
-        """Initializes the manager with a database instance."""
+    def __init__(self, db: Database, cache_size: int = 1024, day_cache_size: int = 128, month_cache_size: int = 24):
+        """Initializes the manager with a database instance and its read-through cache."""
         self.db = db
+        self.cache = EventCache(db, cache_size, day_cache_size)
+        self._series = None
+        self._listeners = []
+        # Upcoming events by start time, kept current from the manager's own change events
+        self.starts = StartIndex(db)
+        self.subscribe(self._update_index)
+        # Calendar marks per (year, month), dropped for the months a write touches
+        self._month_marks = LRUCache(month_cache_size)
+        self.subscribe(self._drop_month_marks)
+
+    def subscribe(self, callback):
+        """Calls callback(change: EventChange) after every write made through the manager.
+        Returns a function that removes the subscription."""
+        self._listeners.append(callback)
+
+        def unsubscribe():
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+        return unsubscribe
+
+    def _emit(self, change: EventChange):
+        for callback in list(self._listeners):
+            try:
+                callback(change)
+            except Exception as exc:
+                print(f"[ERROR] Change listener failed on {change}: {exc}")
+
+    def _update_index(self, change: EventChange):
+        if change.kind in (BULK_IMPORTED, RESET):
+            self.starts.invalidate()
+        elif change.kind == DELETED:
+            self.starts.discard(change.event_id)
+        elif change.event:
+            if change.event.get("start_at", "") >= datetime.now().strftime(DT_FORMAT):
+                self.starts.add(change.event)
+            else:
+                self.starts.discard(change.event_id)
+
+    def _drop_month_marks(self, change: EventChange):
+        if change.kind in (BULK_IMPORTED, RESET) or change.recurring:
+            self._month_marks.clear()
+            return
+        for ev in (change.event, change.previous):
+            if ev:
+                try:
+                    y, m, _ = map(int, ev["date"].split("-"))
+                except (AttributeError, ValueError):
+                    continue
+                self._month_marks.pop((y, m))
+
+    def add(self, title, description, date, time, priority, recurrence: dict | None = None):
+        """Creates a new event and saves it to the database.
+        With a recurrence rule the event is stored once as the first occurrence of a series."""
+        with self.db.transaction():
+            event_id = self.db.add_event({
+                "title": title,
+                "description": description,
+                "date": date,
+                "time": time,
+                "priority": priority,
+            })
+            if recurrence:
+                self.db.set_recurrence(event_id, recurrence)
+        self.cache.invalidate_event(event_id, date)
+        if recurrence:
+            self._series = None
+        self._emit(EventChange(ADDED, event_id, self.get(event_id), recurring=bool(recurrence)))
+        return event_id
 
-    def add(self, title, description, date, time, priority):
-        """Creates a new event and saves it to the database."""
-        return self.db.add_event({
-            "title": title,
-            "description": description,
-            "date": date,
-            "time": time,
-            "priority": priority,
-        })
+    def get(self, event_id):
+        """Returns a single event by its ID, served from the cache when possible."""
+        return self.cache.get_event(event_id)
 
-    def update(self, event_id, **kwargs):
-        """Updates an existing event identified by its event_id."""
-        self.db.update_event(event_id, kwargs)
+    def update(self, event_id, recurrence=_KEEP, **kwargs):
+        """Updates an existing event identified by its event_id.
+        Fields that are not passed keep their stored values; the read and the write form one transaction.
+        Pass recurrence=None to stop a series repeating, or a rule to (re)define it."""
+        with self.db.transaction():
+            current = self.db.get_event(event_id)
+            if current is None:
+                return
+            previous = dict(current)
+            old_rule = self.db.get_recurrence(event_id)
+            current.update(kwargs)
+            self.db.update_event(event_id, current)
+            rule = old_rule if recurrence is _KEEP else recurrence
+            if rule or recurrence is not _KEEP:
+                # Also refreshes the stored series end after a move
+                self.db.set_recurrence(event_id, rule)
+                self._series = None
+        self.cache.invalidate_event(event_id, previous["date"], current["date"])
+        self._emit(EventChange(UPDATED, event_id, self.get(event_id), previous, recurring=bool(rule or old_rule)))
 
     def delete(self, event_id):
-        """Deletes an event from the database by its ID."""
+        """Deletes an event (or a whole series) from the database by its ID."""
+        ev = self.cache.get_event(event_id)
+        recurring = self.db.get_recurrence(event_id) is not None
+        if recurring:
+            self._series = None
         self.db.delete_event(event_id)
+        self.cache.invalidate_event(event_id, ev["date"] if ev else None)
+        if ev:
+            self._emit(EventChange(DELETED, event_id, previous=ev, recurring=recurring))
+
+    def get_recurrence(self, event_id):
+        """Returns the recurrence rule of an event, or None if it does not repeat."""
+        return self.db.get_recurrence(event_id)
+
+    def skip_occurrence(self, event_id, date_str):
+        """Removes a single date from a series without touching the other occurrences.
+        Skipping the stored first occurrence moves the event to the next one instead
+        (or deletes it when there is no next one)."""
+        ev = self.get(event_id)
+        rule = self.db.get_recurrence(event_id)
+        if ev is None or rule is None:
+            return
+        if date_str == ev["date"]:
+            first = combine(ev["date"], ev["time"])
+            when = next_occurrence(first, rule, first)
+            if when is None:
+                self.delete(event_id)
+            else:
+                self.update(event_id, recurrence=starting_at(first, rule, when),
+                            date=when.strftime(DATE_FORMAT), time=when.strftime("%H:%M"))
+            return
+        self.db.add_recurrence_exception(event_id, date_str)
+        self._series = None
+        ev = self.get(event_id)
+        self._emit(EventChange(UPDATED, event_id, ev, ev, recurring=True))
+
+    def imported(self, count: int):
+        """Records rows bulk-inserted without the manager (e.g. by a background job), dropping the
+        cached views and telling listeners. Call it from the thread the listeners expect."""
+        if count:
+            self.cache.invalidate_all()
+            self._emit(EventChange(BULK_IMPORTED, count=count))
+
+    def invalidate(self):
+        """Forgets all cached events; call after writing to the database without going through the manager.
+        Listeners get a reset change."""
+        self.cache.invalidate_all()
+        self._series = None
+        self._emit(EventChange(RESET))
+
+    def cache_stats(self):
+        """Returns the cache hit/miss counters."""
+        return self.cache.stats()
+
+    def _all_series(self):
+        """Returns the (event, rule) pairs of every series, loaded once and kept until a write changes them."""
+        if self._series is None:
+            self._series = self.db.list_series()
+        return self._series
+
+    def _occurrences_between(self, start: datetime, end: datetime) -> list[dict]:
+        """Expands the series into the occurrences falling in [start, end].
+        The stored first occurrence is skipped, since it is already returned by the regular queries."""
+        result = []
+        for ev, rule in self._all_series():
+            try:
+                first = datetime.strptime(ev["start_at"], DT_FORMAT)
+            except (TypeError, ValueError):
+                continue
+            for when in occurrences(first, rule, start, end):
+                if when != first:
+                    result.append(as_occurrence(ev, when))
+        return result
 
     def events_on(self, date_str):
-        """Returns all events scheduled for a specific date."""
-        return self.db.list_events_by_date(date_str)
+        """Returns all events scheduled for a specific date, including occurrences of recurring events."""
+        events = self.cache.events_on(date_str)
+        try:
+            day = datetime.strptime(date_str, DATE_FORMAT)
+        except ValueError:
+            return events
+        extra = self._occurrences_between(day, day + timedelta(hours=23, minutes=59))
+        if extra:
+            events.extend(extra)
+            events.sort(key=lambda ev: (ev["time"], -PRIORITY_RANK.get(ev["priority"], 0)))
+        return events
     
+    def day_marks(self, start_date: str, end_date: str):
+        """Returns the number of events and highest priority rank of each busy day in the range."""
+        marks = {m["date"]: m for m in self.db.day_counts_between(start_date, end_date)}
+        start = datetime.strptime(start_date, DATE_FORMAT)
+        end = datetime.strptime(end_date, DATE_FORMAT) + timedelta(hours=23, minutes=59)
+        for occ in self._occurrences_between(start, end):
+            mark = marks.setdefault(occ["date"], {"date": occ["date"], "n": 0, "max_priority": 0})
+            mark["n"] += 1
+            mark["max_priority"] = max(mark["max_priority"], PRIORITY_RANK.get(occ["priority"], 0))
+        return [marks[d] for d in sorted(marks)]
+
+    def month_marks(self, year: int, month: int) -> list[dict]:
+        """Returns day_marks() of one month, cached until a write touches that month."""
+        marks = self._month_marks.get((year, month))
+        if marks is None:
+            first = date(year, month, 1)
+            last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+            marks = self.day_marks(first.isoformat(), last.isoformat())
+            self._month_marks.put((year, month), marks)
+        return marks
+
+    def search(self, query: str, limit: int = 50):
+        """Returns the events whose title or description match the query, best matches first."""
+        return self.db.search(query, limit)
+
     def next_up_in(self, hours: int = 3):
         """Returns all events occurring within the next specified hours."""
-        from utils import now_iso_minute, in_hours_iso
-        return self.db.list_in_next_hours(now_iso_minute(), in_hours_iso(hours))
+        now = datetime.now().replace(second=0, microsecond=0)
+        end = now + timedelta(hours=hours)
+        events = self.starts.between(now.strftime(DT_FORMAT), end.strftime(DT_FORMAT))
+        extra = self._occurrences_between(now, end)
+        if extra:
+            events.extend(extra)
+            events.sort(key=lambda ev: ev["start_at"])
+        return events
+
+    def upcoming(self, limit: int | None = None, after: datetime | None = None) -> list[dict]:
+        """Returns the next events starting after "after" (default now), earliest first.
+        A recurring event contributes its next occurrence."""
+        after = after or datetime.now()
+        start = (after.replace(second=0, microsecond=0) + timedelta(minutes=1)).strftime(DT_FORMAT)
+        events = self.starts.between(start, limit=limit)
+        repeats = self.next_occurrences(after)
+        if repeats:
+            events.extend(repeats)
+            events.sort(key=lambda ev: ev["start_at"])
+            if limit is not None:
+                del events[limit:]
+        return events
+
+    def next_occurrences(self, after: datetime | None = None) -> list[dict]:
+        """Returns the next occurrence of every running series whose stored first occurrence is already past."""
+        after = after or datetime.now()
+        result = []
+        for ev, rule in self._all_series():
+            try:
+                first = datetime.strptime(ev["start_at"], DT_FORMAT)
+            except (TypeError, ValueError):
+                continue
+            if first > after:
+                continue
+            when = next_occurrence(first, rule, after)
+            if when:
+                result.append(as_occurrence(ev, when))
+        return result
     
     def countdown_for(self, event: dict) -> str:
         """Calculates the time remaining until the event and returns a human-readable string."""
-        dt = combine(event["date"], event["time"]) - datetime.now()
-        return human_countdown(dt)
-        
\ No newline at end of file
+        # Indexed events were parsed once when loaded; occurrences of a series are not indexed
+        start = None if event.get("series_id") else self.starts.start_of(event["id"])
+        if start is None:
+            start = combine(event["date"], event["time"])
+        return human_countdown(start - datetime.now())
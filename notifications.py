@@ -1,133 +1,474 @@
+import asyncio
+import heapq
+import itertools
 import threading 
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List
-import winsound
-import tkinter as tk
-from tkinter import messagebox
-
-try:
-    from plyer import notification
-except ImportError:
-    notification = None
 
 
 from database import Database
+from delivery import DeliveryQueue
+from metrics import LatencyHistogram, StatsDumper
+from utils import DT_FORMAT, MAX_ALERT_OFFSET
+from recurrence import next_occurrence
 
-class NotificationScheduler: 
+class AlertHandle:
+    __slots__ = ("due", "func", "args", "cancelled", "_dispatcher")
 
-    def __init__(self, db: Database):
-        '''Initializes the scheduler with the database and prepares the timer storage.'''
-        self.db = db
-        self.timers: Dict[int, List[threading.Timer]] = {}
+    def __init__(self, due: float, func, args, dispatcher):
+        '''A pending call in an AlertDispatcher; cancel() is O(1) and the entry is dropped lazily.'''
+        self.due = due
+        self.func = func
+        self.args = args
+        self.cancelled = False
+        self._dispatcher = dispatcher
 
-    def _notify(self, title: str, message: str):
-        '''Sends notification via sound, system tray, or fallback message box.'''
-        try: 
-            winsound.MessageBeep(winsound.MB_ICONEXCLAMATION)
-        except Exception:
-            pass
+    def cancel(self):
+        if not self.cancelled:
+            self._dispatcher._on_cancel(self)
 
-        if notification:
-            try:
-                notification.notify(
-                    title=title,
-                    message=message,
-                    app_name="Event Planner",
-                    timeout=10
-                )
+
+class AlertDispatcher:
+
+    def __init__(self, clock=time.time):
+        '''Runs callbacks at wall-clock due times from a single thread driven by a min-heap,
+           instead of one OS thread per pending alert. schedule() is O(log n), cancel() O(1).'''
+        self.clock = clock
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._running = False
+        self._generation = 0
+        self.errors = 0
+
+    def schedule(self, delay: float, func, args=()) -> AlertHandle:
+        '''Calls func(*args) on the dispatcher thread after delay seconds.'''
+        with self._cond:
+            handle = AlertHandle(self.clock() + delay, func, args, self)
+            heapq.heappush(self._heap, (handle.due, next(self._seq), handle))
+            if self._heap[0][2] is handle:
+                # New earliest deadline: wake the thread so it sleeps for the right amount
+                self._cond.notify()
+            if not self._running:
+                self._start()
+        return handle
+
+    def pending(self) -> int:
+        '''Number of scheduled, not cancelled calls.'''
+        with self._cond:
+            return len(self._heap) - self._cancelled
+
+    def _start(self):
+        self._running = True
+        # A thread from before stop() notices the new generation and exits instead of competing
+        self._generation += 1
+        self._thread = threading.Thread(target=self._run, args=(self._generation,),
+                                        name="alert-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _on_cancel(self, handle: AlertHandle):
+        with self._cond:
+            # Checked under the lock: a handle already run or dropped by stop() is not in the heap
+            if handle.cancelled:
                 return
-            except:
-                pass
+            handle.cancelled = True
+            self._cancelled += 1
+            # Rebuild once cancelled entries dominate, so the heap stays proportional to live alerts
+            if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
 
-        try:
-            popup = tk.Tk()
-            popup.withdraw()
-            messagebox.showinfo(title, message)
-            popup.destroy()
-        except:
-            print("[ERROR] Could not display notification.")
+    def _run(self, generation: int):
+        while True:
+            with self._cond:
+                handle = None
+                while self._running and self._generation == generation:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due, _, top = self._heap[0]
+                    if top.cancelled:
+                        heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                        continue
+                    wait = due - self.clock()
+                    if wait > 0:
+                        self._cond.wait(wait)
+                        continue
+                    heapq.heappop(self._heap)
+                    # Marked so a late cancel() is a no-op for an entry no longer in the heap
+                    top.cancelled = True
+                    handle = top
+                    break
+                if handle is None:
+                    return
+            try:
+                handle.func(*handle.args)
+            except Exception as exc:
+                self.errors += 1
+                print(f"[ERROR] Alert callback failed: {exc}")
+
+    def stop(self):
+        '''Drops every pending call and ends the dispatcher thread; schedule() starts a new one.'''
+        with self._cond:
+            self._running = False
+            # Marked so a later cancel() does not count them against the emptied heap
+            for _, _, handle in self._heap:
+                handle.cancelled = True
+            self._heap.clear()
+            self._cancelled = 0
+            self._cond.notify_all()
+
+
+class _AlertPlanner(ABC):
+
+    def __init__(self, db: Database, horizon_hours: float | None = None, refill_minutes: float = 15,
+                 delivery: DeliveryQueue | None = None, catch_up_hours: float = 12, clock=datetime.now):
+        '''Decides which outbox alerts to arm and when; subclasses supply the timers (_schedule_timer).
+           Alerts come from the alert_outbox table. With horizon_hours set, only alerts due within that
+           rolling window are armed; the window is topped up every refill_minutes.
+           Unsent alerts that fell due less than catch_up_hours ago (e.g. while the app was closed)
+           are delivered as missed alerts by schedule_all().
+           Alerts are delivered through "delivery" (default: a DeliveryQueue with the default backends).
+           clock returns the current wall-clock datetime; replace it to run on a fake clock.'''
+        self.db = db
+        self.delivery = delivery or DeliveryQueue()
+        self.clock = clock
+        self.timers: Dict[int, list] = {}
+        self.horizon = timedelta(hours=horizon_hours) if horizon_hours else None
+        refill = timedelta(minutes=refill_minutes)
+        if self.horizon and refill >= self.horizon:
+            refill = self.horizon / 2
+        self.refill_interval = refill
+        self.catch_up = timedelta(hours=catch_up_hours)
+        self._armed_until: datetime | None = None
+        self._refill_handle = None
+        # Outbox rows currently armed, keyed on (alert_id, due_at), so overlapping loads never arm
+        # an alert twice while a row re-queued for a new time is armed afresh
+        self._armed: dict = {}
+        self._alert_ids: Dict[int, List[tuple]] = {}
+        # How late alerts fire compared to when they were armed for (missed catch-up alerts excluded)
+        self.lag = LatencyHistogram()
+        self.counters = {"armed": 0, "fired": 0, "missed": 0, "cancelled": 0, "errors": 0}
+        self._dumper: StatsDumper | None = None
+        # Timer callbacks (_fire, _refill) run on the dispatcher thread while schedule_event()/cancel_event()
+        # come from the UI or daemon handlers; every access to timers/_armed/_alert_ids holds this lock
+        self._lock = threading.RLock()
+
+    def _notify(self, title: str, message: str):
+        '''Hands the notification to the delivery queue, which coalesces, rate-limits and sends it.'''
+        self.delivery.submit(title, message)
                   
-    def _notify_event(self, ev: dict):
+    def _notify_event(self, ev: dict, missed: bool = False):
         '''Generates the notification message content.'''
         msg = f"{ev['description']}\nDate: {ev['date']}  Time: {ev['time']}"
-        self._notify(f"🔔 Event: {ev['title']}", msg)
+        self._notify(f"{'⏰ Missed' if missed else '🔔'} Event: {ev['title']}", msg)
 
+    @abstractmethod
     def _schedule_timer(self, delay: float, func, args=()):
-        t = threading.Timer(delay, func, args)
-        t.daemon = True
-        t.start()
-        return t
-    
-
-    def _schedule_event_alerts(self, event: dict):
-        ''' Schedules event notifications based on priority level. '''
-        event_id = event["id"]
-        self.cancel_event(event_id)
-        date_str = event["date"]
-        time_str = event["time"]
-        event_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M")
-        now = datetime.now()
-
-
-        if event_dt <= now:
+        '''Calls func(*args) after delay seconds and returns a handle with a cancel() method.'''
+
+    def _window_end(self) -> str:
+        '''Latest due time that may currently be armed.'''
+        return self._armed_until.strftime(DT_FORMAT) if self._armed_until else "9999-12-31 23:59"
+
+    def _arm(self, alert: dict, now: datetime):
+        '''Arms one outbox row; a row that is already overdue fires right away as a missed alert.'''
+        key = (alert["alert_id"], alert["due_at"])
+        if key in self._armed:
             return
-        
-        self.timers[event_id] = []
-
-        # Map priority strings to number of alerts
-        priority = event.get("priority", "Medium")
-        priority_map = {
-            "Low": 1,
-            "Medium": 2,
-            "High": 3
-        }
-
-        alerts = priority_map.get(priority, 1)
-
-        # Time offsets (in seconds) for each alert level
-        offsets = {
-            1: [0], # At exact time
-            2: [10 * 60, 0], # 10 min before + exact time
-            3: [30 * 60, 10 * 60, 0], # 30 min before, 10min before, exact time 
-        }
-
-        for offset in offsets.get(alerts, [0]):
-            alert_time = event_dt - timedelta(seconds=offset)
-
-            if alert_time <= now:
-                continue 
-
-            delay = (alert_time - now).total_seconds()
-
-            t = self._schedule_timer(
-                 delay,
-                 self._notify_event,
-                 args=(event,)
-            )
-            self.timers[event_id].append(t)
+        due = datetime.strptime(alert["due_at"], DT_FORMAT)
+        missed = (now - due).total_seconds() >= 60
+        target = max(due, now)
+        t = self._schedule_timer((target - now).total_seconds(), self._fire, args=(alert, missed, target))
+        self.counters["armed"] += 1
+        self._armed[key] = t
+        self.timers.setdefault(alert["id"], []).append(t)
+        self._alert_ids.setdefault(alert["id"], []).append(key)
 
+    def _fire(self, alert: dict, missed: bool = False, target: datetime | None = None):
+        '''Delivers an outbox alert and records it as sent.
+            The final alert of a recurring event's occurrence also queues and arms the next occurrence.'''
+        with self._lock:
+            key = (alert["alert_id"], alert["due_at"])
+            handle = self._armed.pop(key, None)
+            if handle is None:
+                # Cancelled (or the scheduler stopped) after the timer had already been dequeued
+                return
+            self._forget(alert["id"], key, handle)
+            try:
+                # Claimed before delivery: when another scheduler (e.g. the daemon) runs on the
+                # same database, only the one whose claim succeeds delivers the alert
+                if self.db.mark_alert_sent(alert["alert_id"], alert["id"], alert["due_at"]):
+                    if missed:
+                        self.counters["missed"] += 1
+                    elif target is not None:
+                        self.lag.record((self.clock() - target).total_seconds())
+                    self.counters["fired"] += 1
+                    ev = dict(alert)
+                    ev["date"], ev["time"] = alert["starts_at"].split(" ")
+                    self._notify_event(ev, missed)
+                    self.db.mark_alert_sent_today(alert["id"])
+                if alert["due_at"] == alert["starts_at"]:
+                    rule = self.db.get_recurrence(alert["id"])
+                    if rule:
+                        series = self.db.get_event(alert["id"])
+                        self._schedule_event_alerts(series, rule, after=datetime.strptime(alert["starts_at"], DT_FORMAT))
+            except Exception as exc:
+                self.counters["errors"] += 1
+                print(f"[ERROR] Alert for event {alert['id']} failed: {exc}")
+
+    def _forget(self, event_id: int, key: tuple, handle):
+        '''Drops a fired alert from the per-event maps, so they only ever hold armed alerts.'''
+        keys = self._alert_ids.get(event_id)
+        if keys and key in keys:
+            keys.remove(key)
+        handles = self.timers.get(event_id)
+        if handles and handle in handles:
+            handles.remove(handle)
+        if not keys:
+            self._alert_ids.pop(event_id, None)
+        if not handles:
+            self.timers.pop(event_id, None)
+
+    def _queue_next_occurrence(self, series: dict, rule: dict, after: datetime):
+        '''Adds the outbox rows of the first occurrence after "after", if it falls inside the horizon.'''
+        try:
+            first = datetime.strptime(series["start_at"], DT_FORMAT)
+        except (TypeError, ValueError):
+            return
+        when = next_occurrence(first, rule, after)
+        if when is None:
+            return
+        if self._armed_until and when - timedelta(seconds=MAX_ALERT_OFFSET) > self._armed_until:
+            # Beyond the horizon: a later refill queues it
+            return
+        self.db.queue_occurrence_alerts(series["id"], when.strftime(DT_FORMAT))
+
+    def _schedule_event_alerts(self, event: dict, rule: dict | None = None, after: datetime | None = None):
+        ''' Arms the pending outbox alerts of one event (the outbox rows follow the priority
+            and start time through database triggers). For a recurring event the next occurrence
+            (after "after", default now) is queued first. '''
+        with self._lock:
+            event_id = event["id"]
+            self._cancel(event_id)
+            now = self.clock()
+            if rule:
+                self._queue_next_occurrence(event, rule, max(now, after or now))
+            for alert in self.db.pending_alerts_for(event_id, now.strftime(DT_FORMAT), self._window_end()):
+                self._arm(alert, now)
+
+    def _load(self, since: datetime):
+        '''Queues the next occurrence of running series and arms every unsent alert due
+            between "since" and the end of the window with a single outbox query.'''
+        with self._lock:
+            now = self.clock()
+            if self.horizon:
+                self._armed_until = now + self.horizon
+            start = since.strftime(DT_FORMAT)
+            series_end = (
+                (self._armed_until + timedelta(seconds=MAX_ALERT_OFFSET)).strftime(DT_FORMAT)
+                if self._armed_until else None
+            )
+            for ev, rule in self.db.list_series(start_iso=now.strftime(DT_FORMAT), end_iso=series_end):
+                self._queue_next_occurrence(ev, rule, now)
+            for alert in self.db.pending_alerts(start, self._window_end()):
+                self._arm(alert, now)
 
     def schedule_all(self):
-        """Schedules alerts for ALL events in the database."""
-        events = self.db.list_all()
-        for ev in events:
-            self._schedule_event_alerts(ev)
+        """Arms all pending alerts (only those inside the horizon when one is configured)
+        and delivers the ones missed in the last catch_up_hours."""
+        self._schedule_all()
+
+    def _schedule_all(self):
+        with self._lock:
+            now = self.clock()
+            self.db.purge_alerts((now - max(self.catch_up, timedelta(days=30))).strftime(DT_FORMAT))
+            self._load(now - self.catch_up)
+            if self.horizon:
+                self._schedule_refill()
+
+    def _refill(self):
+        """Extends the armed window to now + horizon and schedules the next refill.
+        Only rows due after the previous window end are read; already armed rows are skipped."""
+        with self._lock:
+            since = self._armed_until or self.clock()
+            self._load(since)
+            self._schedule_refill()
+
+    def _schedule_refill(self):
+        if self._refill_handle:
+            self._refill_handle.cancel()
+        self._refill_handle = self._schedule_timer(self.refill_interval.total_seconds(), self._refill)
 
     def schedule_event(self, event: dict):
         """Schedules alerts for a single new or edited event."""
-        self._schedule_event_alerts(event)
+        with self._lock:
+            self._schedule_event_alerts(event, self.db.get_recurrence(event["id"]))
 
     def cancel_event(self, event_id: int):
         """Cancels all scheduled notifications for a specific event."""
-        if event_id in self.timers:
-            for t in self.timers[event_id]:
-                try:
+        self._cancel(event_id)
+
+    def _cancel(self, event_id: int):
+        # The planner itself only calls this synchronous version, never the (possibly async) public one
+        with self._lock:
+            for key in self._alert_ids.pop(event_id, []):
+                if self._armed.pop(key, None) is not None:
+                    self.counters["cancelled"] += 1
+            for t in self.timers.pop(event_id, []):
+                t.cancel()
+
+    def stats(self) -> dict:
+        '''Pending alert count, fire/miss/cancel/error counters, firing lag and delivery metrics.'''
+        with self._lock:
+            return {
+                "pending": len(self._armed),
+                "armed_until": self._armed_until.strftime(DT_FORMAT) if self._armed_until else None,
+                **self.counters,
+                "lag": self.lag.snapshot(),
+                "delivery": self.delivery.stats(),
+            }
+
+    def dump_stats(self, path, interval_seconds: float = 60):
+        '''Writes stats() as JSON to path every interval_seconds until stop().'''
+        if self._dumper:
+            self._dumper.stop()
+        self._dumper = StatsDumper(self.stats, path, interval_seconds)
+        self._dumper.start()
+
+    def reload(self):
+        '''Drops every armed alert and arms them again from the database (e.g. after a restore).'''
+        with self._lock:
+            self._clear()
+            self._schedule_all()
+
+    def refresh(self):
+        '''Arms alerts added to the database behind the scheduler's back (e.g. by an import),
+           without catch-up and without touching the alerts already armed.'''
+        with self._lock:
+            self._load(self.clock())
+
+    def _stop_dumper(self):
+        if self._dumper:
+            self._dumper.stop()
+            self._dumper = None
+
+    def _clear(self):
+        with self._lock:
+            for handles in self.timers.values():
+                for t in handles:
                     t.cancel()
-                except:
-                    pass
-            self.timers[event_id] = []
+            if self._refill_handle:
+                self._refill_handle.cancel()
+            self.timers.clear()
+            self._armed.clear()
+            self._alert_ids.clear()
+            self._armed_until = None
+            self._refill_handle = None
+
+
+class NotificationScheduler(_AlertPlanner):
+
+    def __init__(self, db: Database, horizon_hours: float | None = None, refill_minutes: float = 15,
+                 delivery: DeliveryQueue | None = None, catch_up_hours: float = 12):
+        '''Initializes the scheduler with the database and prepares the timer storage.
+           Timers run on one AlertDispatcher thread; see _AlertPlanner for the arguments.'''
+        super().__init__(db, horizon_hours, refill_minutes, delivery, catch_up_hours)
+        self.dispatcher = AlertDispatcher()
+
+    def _schedule_timer(self, delay: float, func, args=()):
+        return self.dispatcher.schedule(delay, func, args)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "dispatcher_pending": self.dispatcher.pending(),
+                "dispatcher_errors": self.dispatcher.errors}
 
     def stop(self):
         """Stops all scheduled notifications."""
-        for key in list(self.timers.keys()):
-            self.cancel_event(key)
\ No newline at end of file
+        self._stop_dumper()
+        self._clear()
+        self.dispatcher.stop()
+        self.delivery.close()
+
+
+class _LoopTimer:
+    __slots__ = ("_loop", "_executor", "_deadline", "_func", "_args", "_handle", "_cancelled")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, executor, delay: float, func, args):
+        '''A loop.call_at() timer that may be created and cancelled from any thread;
+           when it expires, func(*args) runs on the executor rather than on the loop.'''
+        self._loop = loop
+        self._executor = executor
+        self._deadline = loop.time() + delay
+        self._func = func
+        self._args = args
+        self._handle = None
+        self._cancelled = False
+        loop.call_soon_threadsafe(self._start)
+
+    def _start(self):
+        if not self._cancelled:
+            self._handle = self._loop.call_at(self._deadline, self._run)
+
+    def _run(self):
+        self._loop.run_in_executor(self._executor, self._func, *self._args)
+
+    def cancel(self):
+        self._cancelled = True
+        if self._handle is not None:
+            self._loop.call_soon_threadsafe(self._handle.cancel)
+
+
+class AsyncNotificationScheduler(_AlertPlanner):
+
+    def __init__(self, db: Database, loop: asyncio.AbstractEventLoop | None = None,
+                 horizon_hours: float | None = None, refill_minutes: float = 15,
+                 delivery: DeliveryQueue | None = None, catch_up_hours: float = 12, clock=datetime.now):
+        '''Same planning as NotificationScheduler, but every alert is a loop.call_at() handle on
+           an asyncio event loop instead of an entry in a dispatcher thread. The loop only keeps the
+           deadlines: planning, SQLite reads/writes and closing the delivery queue run on one worker
+           thread, so nothing blocks the loop. The public methods are coroutines.
+           Without "loop" it must be created inside a running loop. For tests, pass a loop whose time()
+           is fake together with a matching clock.'''
+        super().__init__(db, horizon_hours, refill_minutes, delivery, catch_up_hours, clock)
+        self.loop = loop or asyncio.get_running_loop()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-planner")
+
+    def _schedule_timer(self, delay: float, func, args=()):
+        return _LoopTimer(self.loop, self._executor, delay, func, args)
+
+    async def _call(self, func, *args):
+        return await self.loop.run_in_executor(self._executor, func, *args)
+
+    async def schedule_all(self):
+        await self._call(self._schedule_all)
+
+    async def schedule_event(self, event: dict):
+        await self._call(super().schedule_event, event)
+
+    async def cancel_event(self, event_id: int):
+        await self._call(self._cancel, event_id)
+
+    async def refresh(self):
+        await self._call(super().refresh)
+
+    async def reload(self):
+        await self._call(super().reload)
+
+    def pending(self) -> int:
+        '''Number of armed alerts.'''
+        return len(self._armed)
+
+    async def stop(self):
+        """Cancels every loop handle and flushes the delivery queue, off the loop."""
+        await self._call(self._stop_dumper)
+        await self._call(self._clear)
+        await self._call(self.delivery.close)
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,122 @@
+import calendar
+import math
+from datetime import datetime, timedelta
+from utils import DATE_FORMAT, DT_FORMAT
+
+# Supported repeat frequencies; "interval" counts in these units
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def normalize_rule(rule: dict) -> dict:
+    """Validates a recurrence rule and returns it with defaults filled in.
+    Keys: freq, interval (>= 1), count (optional), until ('YYYY-MM-DD', optional), exceptions (list of dates)."""
+    freq = (rule.get("freq") or "").lower()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"Unsupported recurrence frequency: {rule.get('freq')!r}")
+    interval = int(rule.get("interval") or 1)
+    if interval < 1:
+        raise ValueError("Recurrence interval must be at least 1.")
+    count = rule.get("count")
+    count = int(count) if count not in (None, "") else None
+    if count is not None and count < 1:
+        raise ValueError("Recurrence count must be at least 1.")
+    until = rule.get("until") or None
+    if until:
+        until = datetime.strptime(until, DATE_FORMAT).strftime(DATE_FORMAT)
+    exceptions = sorted({datetime.strptime(d, DATE_FORMAT).strftime(DATE_FORMAT)
+                         for d in rule.get("exceptions") or []})
+    return {"freq": freq, "interval": interval, "count": count, "until": until, "exceptions": exceptions}
+
+
+def _add_months(start: datetime, months: int) -> datetime:
+    """Moves start forward by whole months, clamping the day to the end of shorter months."""
+    month_index = start.month - 1 + months
+    year, month = start.year + month_index // 12, month_index % 12 + 1
+    day = min(start.day, calendar.monthrange(year, month)[1])
+    return start.replace(year=year, month=month, day=day)
+
+
+def _nth(start: datetime, rule: dict, k: int) -> datetime:
+    """Returns the k-th occurrence of the series (k=0 is the first one)."""
+    if rule["freq"] == "monthly":
+        return _add_months(start, k * rule["interval"])
+    days = rule["interval"] * (7 if rule["freq"] == "weekly" else 1)
+    return start + timedelta(days=k * days)
+
+
+def _first_index_from(start: datetime, rule: dict, moment: datetime) -> int:
+    """Returns the index of the first occurrence at or after moment, without walking the earlier ones."""
+    if moment <= start:
+        return 0
+    if rule["freq"] == "monthly":
+        months = (moment.year - start.year) * 12 + moment.month - start.month
+        k = max(0, months // rule["interval"])
+        while _nth(start, rule, k) < moment:
+            k += 1
+        return k
+    step = timedelta(days=rule["interval"] * (7 if rule["freq"] == "weekly" else 1))
+    return math.ceil((moment - start) / step)
+
+
+def last_occurrence(start: datetime, rule: dict) -> datetime | None:
+    """Returns the start of the last occurrence, or None for a series without end."""
+    ends = []
+    if rule.get("count"):
+        ends.append(_nth(start, rule, rule["count"] - 1))
+    if rule.get("until"):
+        ends.append(datetime.strptime(rule["until"], DATE_FORMAT).replace(hour=23, minute=59))
+    return min(ends) if ends else None
+
+
+def occurrences(start: datetime, rule: dict, window_start: datetime, window_end: datetime):
+    """Yields the occurrence start times falling in [window_start, window_end].
+    Only the occurrences inside the window are computed, however long the series is."""
+    end = last_occurrence(start, rule)
+    if end is not None and end < window_end:
+        window_end = end
+    exceptions = set(rule.get("exceptions") or ())
+    k = _first_index_from(start, rule, window_start)
+    while True:
+        if rule.get("count") and k >= rule["count"]:
+            return
+        when = _nth(start, rule, k)
+        if when > window_end:
+            return
+        if when.strftime(DATE_FORMAT) not in exceptions:
+            yield when
+        k += 1
+
+
+def next_occurrence(start: datetime, rule: dict, after: datetime) -> datetime | None:
+    """Returns the first occurrence strictly after the given moment, or None when the series is over."""
+    end = last_occurrence(start, rule)
+    if end is not None and end <= after:
+        return None
+    # Exceptions can skip occurrences, so look ahead a bounded number of steps
+    horizon = _nth(start, rule, _first_index_from(start, rule, after) + len(rule.get("exceptions") or ()) + 1)
+    for when in occurrences(start, rule, after, horizon):
+        if when > after:
+            return when
+    return None
+
+
+def starting_at(start: datetime, rule: dict, when: datetime) -> dict:
+    """Returns the rule of the same series re-anchored on its occurrence "when" (e.g. after the first
+    occurrence was skipped): the count shrinks by the occurrences before it and older exceptions are dropped.
+    Monthly series anchored on day 29-31 follow the new anchor's day from then on."""
+    new_rule = dict(rule)
+    if rule.get("count"):
+        new_rule["count"] = rule["count"] - _first_index_from(start, rule, when)
+    day = when.strftime(DATE_FORMAT)
+    new_rule["exceptions"] = [d for d in rule.get("exceptions") or () if d > day]
+    return new_rule
+
+
+def as_occurrence(event: dict, when: datetime) -> dict:
+    """Returns a copy of a series' stored event moved to one of its occurrences."""
+    ev = dict(event)
+    ev["date"] = when.strftime(DATE_FORMAT)
+    ev["time"] = when.strftime("%H:%M")
+    ev["start_at"] = when.strftime(DT_FORMAT)
+    ev["series_id"] = event["id"]
+    return ev
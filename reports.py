@@ -1,59 +1,131 @@
 import csv
 import json
+import textwrap
 from pathlib import Path
 from database import Database
 
-def export_csv(db: Database, filepath: Path | str):
-    """Exports all events from the database to a CSV file."""
-    rows = db.list_all() 
+# Exports report progress (and check for cancellation) once per this many rows
+PROGRESS_EVERY = 500
 
-    if not rows:
+
+def _tracked(rows, progress=None, cancel=None):
+    """Passes rows through, calling progress(count) every PROGRESS_EVERY rows.
+       Stops early, setting state["cancelled"], once cancel() returns True."""
+    state = {"count": 0, "cancelled": False}
+
+    def gen():
+        for r in rows:
+            yield r
+            state["count"] += 1
+            if state["count"] % PROGRESS_EVERY == 0:
+                if progress:
+                    progress(state["count"])
+                if cancel and cancel():
+                    state["cancelled"] = True
+                    return
+    return gen(), state
+
+
+def _finish(tmp: Path, filepath: Path | str, state: dict, progress=None, cancel=None) -> int | None:
+    """Moves a completed export into place, or drops it if it was cancelled (also during the
+       last, unchecked rows). Returns the rows written, or None if no file was written."""
+    if state["cancelled"] or (cancel and cancel()):
+        tmp.unlink(missing_ok=True)
+        return None
+    tmp.replace(filepath)
+    if progress:
+        progress(state["count"])
+    return state["count"]
+
+
+def export_csv(db: Database, filepath: Path | str, include_archive: bool = True,
+               progress=None, cancel=None) -> int | None:
+    """Exports all events from the database to a CSV file, streaming rows in batches.
+       progress(rows_written) is called along the way; if cancel() returns True the export stops
+       and no file is written. Returns the number of rows written, or None if it was cancelled."""
+    rows, state = _tracked(db.iter_all(include_archive=include_archive), progress, cancel)
+    first = next(rows, None)
+
+    if first is None:
         
         headers = ["id","title","description","date","time","priority","alerts","last_alert_sent"]
     else:
-        headers = list(rows[0].keys())
-    with open(filepath, "w", newline='', encoding="utf-8") as f:
-        
-        writer = csv.DictWriter(f, fieldnames=headers)
-        writer.writeheader()
-        for r in rows:
-            writer.writerow(r) 
+        headers = list(first.keys())
+    tmp = Path(f"{filepath}.part")
+    try:
+        with open(tmp, "w", newline='', encoding="utf-8") as f:
+            
+            writer = csv.DictWriter(f, fieldnames=headers)
+            writer.writeheader()
+            if first is not None:
+                writer.writerow(first)
+            for r in rows:
+                writer.writerow(r) 
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _finish(tmp, filepath, state, progress, cancel)
 
 
-def import_csv(db: Database, filepath: Path | str):
-    with open(filepath, newline='', encoding="utf-8") as f:
-        """Imports events from a CSV file and adds them to the database."""
-        reader = csv.DictReader(f)
-        for r in reader:
-
-            data = {
-            "title": r.get("title",""),
-            "description": r.get("description",""),
-            "date": r.get("date",""),
-            "time": r.get("time",""),
-            "priority": r.get("priority","Medium"),
-            "alerts": int(r.get("alerts",1) or 1),
-            }
-            db.add_event(data)
-
-
-def export_json(db: Database, filepath: Path | str):
-    """Exports all events from the database to a JSON file."""
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(db.list_all(), f, ensure_ascii=False, indent=2)
-         
-
-def import_json(db: Database, filepath: Path | str):
-    """Imports events from a JSON file and adds them to the database."""
-    with open(filepath, encoding="utf-8") as f:
-        arr = json.load(f)
-    for r in arr:
-        data = {
+def _import_row(r: dict) -> dict:
+    """Maps a row read from a CSV/JSON file to the fields accepted by the database."""
+    return {
         "title": r.get("title",""),
         "description": r.get("description",""),
         "date": r.get("date",""),
         "time": r.get("time",""),
         "priority": r.get("priority","Medium"),
-        "alerts": int(r.get("alerts",1) or 1),
-        }
-        db.add_event(data)
\ No newline at end of file
+        "alerts": r.get("alerts",1) or 1,
+    }
+
+
+def read_csv(filepath: Path | str):
+    """Yields the events of a CSV file, mapped to database fields, one row at a time."""
+    with open(filepath, newline='', encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            yield _import_row(r)
+
+
+def import_csv(db: Database, filepath: Path | str, chunk_size: int = 1000,
+               progress=None, cancel=None) -> tuple[int, int]:
+    """Imports events from a CSV file in a single batched insert.
+       progress/cancel are passed to Database.add_events_many.
+       Returns the number of inserted and rejected rows."""
+    return db.add_events_many(read_csv(filepath), chunk_size, progress, cancel)
+
+
+def export_json(db: Database, filepath: Path | str, include_archive: bool = True,
+                progress=None, cancel=None) -> int | None:
+    """Exports all events from the database to a JSON file, streaming rows in batches.
+       The output is the same as json.dump(..., indent=2) of the whole list.
+       progress and cancel work as in export_csv. Returns the number of rows written, or None if cancelled."""
+    rows, state = _tracked(db.iter_all(include_archive=include_archive), progress, cancel)
+    tmp = Path(f"{filepath}.part")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("[")
+            count = 0
+            for r in rows:
+                f.write(",\n" if count else "\n")
+                f.write(textwrap.indent(json.dumps(r, ensure_ascii=False, indent=2), "  "))
+                count += 1
+            f.write("\n]" if count else "]")
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return _finish(tmp, filepath, state, progress, cancel)
+         
+
+def read_json(filepath: Path | str):
+    """Yields the events of a JSON file, mapped to database fields."""
+    with open(filepath, encoding="utf-8") as f:
+        arr = json.load(f)
+    return (_import_row(r) for r in arr)
+
+
+def import_json(db: Database, filepath: Path | str, chunk_size: int = 1000,
+                progress=None, cancel=None) -> tuple[int, int]:
+    """Imports events from a JSON file in a single batched insert.
+       progress/cancel are passed to Database.add_events_many.
+       Returns the number of inserted and rejected rows."""
+    return db.add_events_many(read_json(filepath), chunk_size, progress, cancel)
@@ -0,0 +1,105 @@
+# test_async_scheduler.py
+import asyncio
+import warnings
+from datetime import datetime, timedelta
+
+from database import Database
+from delivery import DeliveryQueue, MemoryBackend
+from notifications import AsyncNotificationScheduler
+
+START = datetime(2099, 1, 1, 8, 0)
+
+
+class FakeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time() only moves when the test advances it."""
+    now = 0.0
+
+    def time(self):
+        return self.now
+
+
+async def _settle(scheduler: AsyncNotificationScheduler):
+    """Waits for the planner thread to go idle and for the timers it armed to reach the loop."""
+    for _ in range(3):
+        await scheduler._call(lambda: None)
+        await asyncio.sleep(0)
+
+
+async def _advance(scheduler: AsyncNotificationScheduler, clock: dict, minutes: int):
+    for _ in range(minutes):
+        scheduler.loop.now += 60
+        clock["now"] += timedelta(minutes=1)
+        await asyncio.sleep(0)
+        await _settle(scheduler)
+
+
+def _run(coro_fn):
+    loop = FakeLoop()
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            return loop.run_until_complete(coro_fn(loop))
+    finally:
+        loop.close()
+
+
+def test_edited_event_moves_its_alerts():
+    db = Database(":memory:")
+    event_id = db.add_event({"title": "Review", "description": "", "date": "2099-01-01",
+                             "time": "10:00", "priority": "High"})
+
+    async def scenario(loop):
+        clock = {"now": START}
+        memory = MemoryBackend()
+        s = AsyncNotificationScheduler(db, loop, clock=lambda: clock["now"],
+                                       delivery=DeliveryQueue([memory], coalesce_seconds=0))
+        await s.schedule_all()
+        await _settle(s)
+        assert s.pending() == 3
+
+        db.update_event(event_id, {"title": "Review", "description": "", "date": "2099-01-02",
+                                   "time": "10:00", "priority": "High"})
+        await s.schedule_event(db.get_event(event_id))
+        await _settle(s)
+        assert s.pending() == 3
+
+        # Past the old start: nothing may fire for the old date
+        await _advance(s, clock, 3 * 60)
+        assert s.pending() == 3
+        # Past the new start: the three alerts of the new date fire
+        await _advance(s, clock, 24 * 60)
+        assert s.pending() == 0
+        await s.stop()
+        return memory.sent
+
+    sent = _run(scenario)
+    assert sent and all("2099-01-02" in message for _, message in sent), sent
+
+
+def test_cancelled_event_does_not_fire():
+    db = Database(":memory:")
+    event_id = db.add_event({"title": "Call", "description": "", "date": "2099-01-01",
+                             "time": "08:30", "priority": "Medium"})
+
+    async def scenario(loop):
+        clock = {"now": START}
+        memory = MemoryBackend()
+        s = AsyncNotificationScheduler(db, loop, clock=lambda: clock["now"],
+                                       delivery=DeliveryQueue([memory], coalesce_seconds=0))
+        await s.schedule_all()
+        await _settle(s)
+        assert s.pending() == 2
+        await s.cancel_event(event_id)
+        await _settle(s)
+        assert s.pending() == 0
+        await _advance(s, clock, 60)
+        await s.stop()
+        return memory.sent
+
+    assert _run(scenario) == []
+
+
+if __name__ == "__main__":
+    test_edited_event_moves_its_alerts()
+    test_cancelled_event_does_not_fire()
+    print("Async scheduler follows edits and cancels on a fake clock.")
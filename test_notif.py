@@ -20,4 +20,7 @@ notif = NotificationScheduler(db)
 # Trigger the notification instantly to verify the system works
 notif._notify_event(fake_event)
 
+# Flush the delivery queue before the script exits
+notif.stop()
+
 print("Test notification sent successfully!")
@@ -0,0 +1,52 @@
+# test_query_plan.py
+import sqlite3
+from database import Database
+
+DAY_VIEW_SQL = "SELECT * FROM events WHERE date=? ORDER BY time ASC, priority_rank DESC"
+
+
+def _plan(db: Database, sql: str, params=()) -> str:
+    """Returns the EXPLAIN QUERY PLAN details of a query as one string."""
+    rows = db.conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return " | ".join(r["detail"] for r in rows)
+
+
+def test_day_view_reads_index_without_sorting():
+    db = Database(":memory:")
+    plan = _plan(db, DAY_VIEW_SQL, ("2030-01-01",))
+    assert "idx_events_day" in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def test_day_view_orders_by_time_then_priority():
+    db = Database(":memory:")
+    for time, priority in (("10:00", "Low"), ("09:00", "Low"), ("09:00", "High"), ("09:00", "Medium")):
+        db.add_event({"title": "x", "date": "2030-01-01", "time": time, "priority": priority})
+    events = db.list_events_by_date("2030-01-01")
+    assert [(e["time"], e["priority"]) for e in events] == [
+        ("09:00", "High"), ("09:00", "Medium"), ("09:00", "Low"), ("10:00", "Low"),
+    ]
+
+
+def test_priority_rank_is_migrated(tmp_path):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """CREATE TABLE events(id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+           date TEXT NOT NULL, time TEXT NOT NULL, priority TEXT DEFAULT 'Medium',
+           alerts INTEGER DEFAULT 1, last_alert_sent TEXT)"""
+    )
+    conn.execute("INSERT INTO events(title, date, time, priority) VALUES('a', '2030-01-01', '09:00', 'High')")
+    conn.commit()
+    conn.close()
+
+    db = Database(path)
+    assert db.get_event(1)["priority_rank"] == 3
+    assert "TEMP B-TREE" not in _plan(db, DAY_VIEW_SQL, ("2030-01-01",))
+    db.close()
+
+
+if __name__ == "__main__":
+    test_day_view_reads_index_without_sorting()
+    test_day_view_orders_by_time_then_priority()
+    print("Day view query plan uses idx_events_day without a sort step.")
@@ -4,6 +4,17 @@ TIME_FORMAT = "%H:%M"
 DATE_FORMAT = "%Y-%m-%d"
 DT_FORMAT   = "%Y-%m-%d %H:%M"
 
+# Numeric rank of each priority; stored in events.priority_rank so the day view can be read in index order
+PRIORITY_RANK = {"High": 3, "Medium": 2, "Low": 1}
+
+# Alert offsets (in seconds before the start) for each priority level
+ALERT_OFFSETS = {
+    "Low": [0], # At exact time
+    "Medium": [10 * 60, 0], # 10 min before + exact time
+    "High": [30 * 60, 10 * 60, 0], # 30 min before, 10min before, exact time
+}
+MAX_ALERT_OFFSET = max(max(v) for v in ALERT_OFFSETS.values())
+
 
 def parse_time(hhmm: str) -> datetime:
     """Converts 'HH:MM' string into a datetime object."""